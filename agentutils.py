@@ -0,0 +1,376 @@
+import logging
+import orjson
+import requests
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson-backed helpers for the per-call encode/decode hot paths
+loads = orjson.loads
+
+def dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode()
+
+# Longest Retry-After wait honoured on a 429/503; urllib3's own cap is six hours, which would hold a
+# tool-pool worker (and the FastAPI request waiting on it) far past the request timeouts
+_RETRY_AFTER_MAX = 5.0
+
+class _CappedRetry(Retry):
+    """Retry that honours Retry-After but never sleeps longer than _RETRY_AFTER_MAX"""
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, _RETRY_AFTER_MAX)
+
+def unleash_retry(total: int = 3, backoff_factor: float = 0.3) -> Retry:
+    """
+    Retry policy shared by the agents' Unleash API sessions
+    
+    Idempotent requests are retried on connect errors and 429/5xx statuses with exponential backoff,
+    waiting for the server's Retry-After (capped) when it sends one. Read stalls are not retried, so a
+    hung upstream surfaces as a single ReadTimeout instead of a ConnectionError several timeouts later.
+    """
+    return _CappedRetry(
+        total=total,
+        read=False,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True
+    )
+
+def unleash_session(
+    api_key: str,
+    pool_connections: int = 10,
+    pool_maxsize: int = 20,
+    retries: int = 3,
+    backoff_factor: float = 0.3
+) -> requests.Session:
+    """Pooled Unleash API session: keep-alive connections reused across calls, unleash_retry() and the auth headers"""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=unleash_retry(total=retries, backoff_factor=backoff_factor)
+    ))
+    session.headers.update({
+        "accept": "application/json",
+        "x-api-key": api_key
+    })
+    return session
+
+class TTLCache:
+    """
+    Thread-safe LRU of fetched values, each kept for the TTL it was stored with
+    
+    get_or_fetch() is single-flight: concurrent misses on one key share the first caller's fetch.
+    Only values a fetch returns are stored, so a fetch that raises is never cached.
+    """
+
+    def __init__(self, max_entries: int, log: logging.LoggerAdapter):
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._max_entries = max_entries
+        self._log = log
+        self._lock = threading.Lock()
+
+    def get_or_fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Any],
+        label: str,
+        bypass: bool = False,
+        on_hit: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """
+        Return the live cached value for key, or call fetch() and cache its result for ttl seconds
+        
+        With bypass set the cached value is not read, but the fresh result still replaces it.
+        label names the request in the debug log; on_hit is called when the cache answers.
+        """
+        with self._lock:
+            entry = None if bypass else self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                self._log.debug("⚡ CACHE HIT: %s", label)
+                if on_hit is not None:
+                    on_hit()
+                return entry[1]
+            
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        
+        if not leader:
+            self._log.debug("🔗 JOINING IN-FLIGHT REQUEST: %s", label)
+            return flight.result()
+        
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            flight.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            del self._inflight[key]
+        flight.set_result(value)
+        
+        return value
+
+    def clear(self) -> None:
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+class VerboseLog(logging.LoggerAdapter):
+    """
+    Per-agent view of a module logger that drops debug records unless that agent is verbose
+    
+    Levels and handlers are left to the application (see enable_verbose_output), so constructing
+    an agent never changes what other instances, or root/uvicorn logging, get to see.
+    """
+
+    def __init__(self, logger: logging.Logger, verbose: bool):
+        super().__init__(logger, {})
+        self.verbose = verbose
+
+    def isEnabledFor(self, level: int) -> bool:
+        return (self.verbose or level > logging.DEBUG) and self.logger.isEnabledFor(level)
+
+def enable_verbose_output(*names: str) -> None:
+    """Let the named agent loggers emit debug records, printing them to stdout unless logging is already routed somewhere"""
+    for name in names:
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.DEBUG)
+        if not logger.hasHandlers():
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions per `period` seconds"""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self._capacity = float(rate)
+        self._tokens = float(rate)
+        self._fill_rate = rate / period
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._fill_rate
+            time.sleep(wait)
+
+def collect_tool_calls(
+    stream: Iterable[Any],
+    on_call: Callable[[Dict[str, Any]], None],
+    on_content: Optional[Callable[[str], None]] = None
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Assemble a streamed chat completion's content and tool calls
+    
+    Tool calls stream one after another, so a delta for a new index means the previous call's
+    arguments are complete; each call is handed to on_call at that point, while generation continues.
+    Calls are keyed by their stream index, so a skipped index does not break assembly.
+    
+    Returns:
+        Tuple[str, List[Dict]]: The joined content and the tool calls (in chat message form),
+            in the order they were passed to on_call
+    """
+    content_parts = []
+    calls: Dict[int, Dict[str, Any]] = {}
+    current = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content_parts.append(delta.content)
+            if on_content is not None:
+                on_content(delta.content)
+        for tool_delta in delta.tool_calls or ():
+            function = tool_delta.function
+            call = calls.get(tool_delta.index)
+            if call is None:
+                if current is not None:
+                    on_call(calls[current])
+                current = tool_delta.index
+                call = calls[current] = {
+                    "id": tool_delta.id,
+                    "type": "function",
+                    "function": {"name": function.name if function else None, "arguments": ""}
+                }
+            if function and function.arguments:
+                call["function"]["arguments"] += function.arguments
+    if current is not None:
+        on_call(calls[current])
+    return "".join(content_parts), list(calls.values())
+
+_BATCH_FINAL_STATES = frozenset(["completed", "failed", "expired", "cancelled"])
+
+def poll_batch(client: Any, batch_id: str, log: logging.LoggerAdapter, poll_interval: float = 30.0, max_interval: float = 300.0) -> Any:
+    """Wait for an OpenAI batch to reach a final state, backing off exponentially between checks"""
+    batch = client.batches.retrieve(batch_id)
+    delay = poll_interval
+    while batch.status not in _BATCH_FINAL_STATES:
+        time.sleep(delay)
+        delay = min(delay * 2, max_interval)
+        batch = client.batches.retrieve(batch_id)
+        log.debug("⏳ BATCH %s: %s", batch_id, batch.status)
+    return batch
+
+def run_batch(client: Any, bodies: List[Dict[str, Any]], log: logging.LoggerAdapter, poll_interval: float) -> List[Dict[str, Any]]:
+    """Submit chat completion bodies as one OpenAI batch and return the response bodies in order"""
+    # JSONL is built from orjson's bytes directly, with no str decode/encode round trip
+    lines = [
+        orjson.dumps({"custom_id": f"q{i}", "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for i, body in enumerate(bodies)
+    ]
+    batch_file = client.files.create(
+        file=("batch.jsonl", b"\n".join(lines)),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    
+    log.debug("📦 BATCH SUBMITTED: %s (%s requests)", batch.id, len(bodies))
+    
+    batch = poll_batch(client, batch.id, log, poll_interval)
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+    
+    # Output lines are not guaranteed to be in input order, so place them by custom_id
+    results: List[Dict[str, Any]] = [{"error": "No result returned"}] * len(bodies)
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).content.splitlines():
+            if not line:
+                continue
+            record = orjson.loads(line)
+            index = int(record["custom_id"][1:])
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[index] = response["body"]
+            else:
+                results[index] = {"error": str(record.get("error") or response.get("body"))}
+    
+    return results
+
+def chat_batch(
+    client: Any,
+    user_messages: List[str],
+    system_msg: Dict[str, str],
+    select_tools: Callable[[str], List[Dict[str, Any]]],
+    run_tool_call: Callable[[str, Dict[str, Any]], str],
+    executor: Executor,
+    log: logging.LoggerAdapter,
+    poll_interval: float = 30.0
+) -> List[str]:
+    """
+    Answer many queries offline through the OpenAI Batch API (lower cost, results within 24h)
+    
+    Args:
+        client: OpenAI client used for the file uploads and batches
+        user_messages (List[str]): Natural language queries from the user
+        system_msg (dict): System message opening every conversation
+        select_tools (callable): Returns the tool schemas offered to GPT-4o for a query
+        run_tool_call (callable): Runs one tool call for a query and returns the tool message
+            content; failures should come back as an error result rather than raise
+        executor (Executor): Pool the tool calls of each query run on concurrently
+        log: The calling agent's logger
+        poll_interval (float): Seconds to wait before the first batch status check
+        
+    Returns:
+        List[str]: One response per query, in the same order as user_messages
+    """
+    try:
+        conversations = [
+            [system_msg, {"role": "user", "content": user_message}]
+            for user_message in user_messages
+        ]
+        responses: List[Optional[str]] = [None] * len(conversations)
+        
+        # First batch: GPT-4o picks the tools for every query
+        decisions = run_batch(
+            client,
+            [
+                {"model": "gpt-4o", "messages": conversation, "tools": select_tools(user_message), "tool_choice": "auto"}
+                for conversation, user_message in zip(conversations, user_messages)
+            ],
+            log,
+            poll_interval
+        )
+        
+        pending = []
+        for i, decision in enumerate(decisions):
+            if "error" in decision:
+                responses[i] = f"An error occurred: {decision['error']}"
+                continue
+            
+            message = decision["choices"][0]["message"]
+            tool_calls = message.get("tool_calls")
+            if not tool_calls:
+                responses[i] = message.get("content") or ""
+                continue
+            
+            # Run this query's tool calls concurrently, keeping results in call order
+            contents = executor.map(lambda tool_call, query=user_messages[i]: run_tool_call(query, tool_call), tool_calls)
+            conversations[i].append({
+                "role": "assistant",
+                "content": message.get("content"),
+                "tool_calls": tool_calls
+            })
+            for tool_call, content in zip(tool_calls, contents):
+                conversations[i].append({
+                    "role": "tool",
+                    "tool_call_id": tool_call["id"],
+                    "content": content
+                })
+            pending.append(i)
+        
+        # Second batch: final answers for the queries that needed tool data
+        if pending:
+            finals = run_batch(
+                client,
+                [{"model": "gpt-4o", "messages": conversations[i]} for i in pending],
+                log,
+                poll_interval
+            )
+            for i, final in zip(pending, finals):
+                if "error" in final:
+                    responses[i] = f"An error occurred: {final['error']}"
+                else:
+                    responses[i] = final["choices"][0]["message"]["content"]
+        
+        return responses
+
+    except Exception as e:
+        error_msg = f"An error occurred: {str(e)}"
+        log.debug("❌ CRITICAL ERROR: %s", error_msg)
+        return [error_msg] * len(user_messages)
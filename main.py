@@ -7,6 +7,7 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import re
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from nftgaming import NFTGamingAgent
@@ -17,6 +18,10 @@ from nftfungible import NFTFungibleAgent
 from nftwallet import NFTWalletAgent
 from nfttoken import NFTTokenAgent
 from portfolio import PortfolioAgent
+from agentutils import enable_verbose_output
+
+# The agents are created verbose below; their debug traces go to stdout unless logging is configured elsewhere
+enable_verbose_output("nftgaming", "nfttoken", "nftwallet", "portfolio")
 
 # FastAPI app initialization
 app = FastAPI(
@@ -1032,7 +1037,8 @@ async def chat_endpoint(request: ChatRequest):
     Main chat endpoint that routes queries to appropriate agents
     
     Args:
-        request: ChatRequest containing the user message and verbose flag
+        request: ChatRequest containing the user message; verbose output follows the
+            shared orchestrator's setting, so request.verbose is accepted but not applied
         
     Returns:
         ChatResponse with the agent response and metadata
@@ -1040,11 +1046,9 @@ async def chat_endpoint(request: ChatRequest):
     try:
         orchestrator = get_orchestrator()
         
-        # Set verbose mode based on request
-        orchestrator.verbose = request.verbose
-        
-        # Process the chat request
-        response = orchestrator.chat(request.message)
+        # Process the chat request on a worker thread; the agents use blocking OpenAI/HTTP
+        # clients, so running them inline would stall every other request on the event loop
+        response = await run_in_threadpool(orchestrator.chat, request.message)
         
         # Extract agent information from the response
         agent_used = "unknown"
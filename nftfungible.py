@@ -1,6 +1,7 @@
 import requests
 import json
 import os
+import orjson
 from typing import Dict, Any, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -31,6 +32,13 @@ class NFTFungibleAgent:
         self.verbose = verbose
         self.base_url = "https://api.unleashnfts.com/api/v1/ft"
         
+        # Shared HTTP session; requests already negotiates gzip/deflate (and br once brotli is installed)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "accept": "application/json",
+            "x-api-key": self.api_key
+        })
+        
         # Chain IDs mapping
         self.chain_ids = {
             "ethereum": 1,
@@ -143,28 +151,25 @@ class NFTFungibleAgent:
             "currency": currency,
             "time_range": time_range
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
-        
         if self.verbose:
             print(f"🌐 API REQUEST: GET {url}")
             print(f"📊 QUERY PARAMS: {params}")
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
-            result = response.json()
+            # response.content is already decompressed; decode it in a single pass
+            result = orjson.loads(response.content)
             
             if self.verbose:
                 print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
+                print(f"📦 CONTENT ENCODING: {response.headers.get('content-encoding', 'identity')}")
+                print(f"📄 RESPONSE SIZE: {len(response.content)} bytes")
                 if isinstance(result, dict) and 'data' in result:
                     print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
             
             return result
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
             if self.verbose:
                 print(f"❌ API ERROR: {error_result}")
@@ -183,38 +188,36 @@ class NFTFungibleAgent:
             print(f"   - token_address: {token_address}")
         
         url = f"{self.base_url}/{chain_id}/{token_address}/price-estimate"
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
-        
         if self.verbose:
             print(f"🌐 API REQUEST: GET {url}")
             print(f"📊 QUERY PARAMS: {{}}")
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url)
             response.raise_for_status()
-            result = response.json()
+            # response.content is already decompressed; decode it in a single pass
+            result = orjson.loads(response.content)
             
             if self.verbose:
                 print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
+                print(f"📦 CONTENT ENCODING: {response.headers.get('content-encoding', 'identity')}")
+                print(f"📄 RESPONSE SIZE: {len(response.content)} bytes")
                 if isinstance(result, dict) and 'data' in result:
                     print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
             
             return result
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
             if self.verbose:
                 print(f"❌ API ERROR: {error_result}")
             return error_result
 
-    def execute_function_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    def execute_function_call(self, function_name: str, arguments_json: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the appropriate function based on the function call"""
         if self.verbose:
             print(f"\n🎯 EXECUTING FUNCTION: {function_name}")
-            print(f"🔍 FUNCTION ARGUMENTS: {json.dumps(arguments, indent=2)}")
+            # arguments_json is the raw JSON string the model sent; no need to re-serialize
+            print(f"🔍 FUNCTION ARGUMENTS: {arguments_json}")
         
         if function_name == "get_historical_price":
             return self.get_historical_price(**arguments)
@@ -313,10 +316,11 @@ When users ask questions, determine which tool(s) to use and call them appropria
                         print(f"🆔 Call ID: {tool_call.id}")
                     
                     function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
+                    function_args_json = tool_call.function.arguments
+                    function_args = json.loads(function_args_json)
                     
                     # Execute the function
-                    function_result = self.execute_function_call(function_name, function_args)
+                    function_result = self.execute_function_call(function_name, function_args_json, function_args)
                     
                     if self.verbose:
                         print(f"✨ TOOL EXECUTION COMPLETED")
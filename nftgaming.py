@@ -1,18 +1,227 @@
 import requests
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
+import orjson
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
 from openai import OpenAI
+from prometheus_client import Counter, Histogram, start_http_server
 from dotenv import load_dotenv
+from agentutils import TTLCache, VerboseLog, dumps, enable_verbose_output, loads, unleash_session
 import re
+import string
+
+log = logging.getLogger(__name__)
+
+# Prometheus metrics for tool usage, upstream latency (Unleash NFTs and GPT-4o) and cache hits
+TOOL_INVOCATIONS = Counter(
+    "nftgaming_tool_calls_total", "Tool invocations by function name", ["function"]
+)
+API_LATENCY = Histogram(
+    "nftgaming_api_seconds", "Upstream request latency by endpoint", ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+CACHE_HITS = Counter(
+    "nftgaming_cache_hits_total", "Responses served from the in-process cache by endpoint", ["endpoint"]
+)
+
+# The metrics endpoint is process-wide; main.py's API server already owns port 8000
+_METRICS_PORT = int(os.getenv("NFTGAMING_METRICS_PORT", "9108"))
+_metrics_started = False
+_metrics_lock = threading.Lock()
+
+def _start_metrics_server() -> None:
+    """Expose the Prometheus metrics endpoint once per process"""
+    global _metrics_started
+    with _metrics_lock:
+        if _metrics_started:
+            return
+        try:
+            start_http_server(_METRICS_PORT)
+        except OSError as e:
+            log.warning("⚠️ Metrics server not started on port %d: %s", _METRICS_PORT, e)
+            return
+        _metrics_started = True
+        log.debug("📈 Metrics available at http://localhost:%d/metrics", _METRICS_PORT)
+
+# Response cache TTL (seconds) per time_range; unlisted ranges fall back to 300s
+_CACHE_TTLS = {"24h": 300, "7d": 900, "30d": 3600}
+_CACHE_MAX_ENTRIES = 512
+
+# (connect, read) timeout for Unleash NFTs requests
+_REQUEST_TIMEOUT = (3.05, 27)
+
+# Tool-routing decisions are reused for identical queries only briefly, so "latest"-style
+# questions are re-decided soon after
+_DECISION_TTL = 60
+_DECISION_CACHE_MAX_ENTRIES = 256
+
+# fast_mode answers single small tool results directly unless the user asks for prose
+_FAST_MODE_MAX_BYTES = 4096
+_SUMMARY_KEYWORDS = ("explain", "summarize", "summarise", "analyze", "analyse", "compare", "why")
+
+# Game names are matched ASCII-lowercased with runs of whitespace collapsed
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_WS = re.compile(r"\s+")
+
+def _format_markdown_table(result: Dict[str, Any]) -> Optional[str]:
+    """Render the 'data' rows of an API result as a Markdown table, if it is tabular"""
+    data = result.get("data") if isinstance(result, dict) else None
+    if not data or not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        return None
+    
+    columns = list(dict.fromkeys(key for row in data for key in row))
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "---|" * len(columns)
+    ]
+    for row in data:
+        lines.append("| " + " | ".join(str(row.get(column, "")) for column in columns) + " |")
+    return "\n".join(lines)
+
+# Shared, immutable agent configuration (built once per process, not per instance/call)
+_SUPPORTED_BLOCKCHAINS = frozenset([
+    "avalanche", "base", "binance", "bitcoin", "berachain",
+    "ethereum", "linea", "polygon", "solana", "unichain"
+])
+
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_game_contracts_info",
+            "description": "Get general overview of game contracts and metrics. Use ONLY for broad queries like 'show me game contracts' or 'list games'. DO NOT use for specific game names.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain network to filter results (optional)",
+                        "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of results to return (default: 30)",
+                        "default": 30
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination (default: 0)",
+                        "default": 0
+                    }
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_nft_gaming_metrics_by_contract",
+            "description": "Fetch NFT gaming metrics for a specific contract address",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain network",
+                        "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"],
+                        "default": "ethereum"
+                    },
+                    "contract_address": {
+                        "type": "string",
+                        "description": "Contract address to fetch metrics for"
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for metrics (e.g., 24h, 7d, 30d)",
+                        "default": "24h"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of results to return",
+                        "default": 30
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    }
+                },
+                "required": ["contract_address"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_nft_gaming_metrics_by_game",
+            "description": "Fetch NFT gaming metrics for a specific game by name. Use this when users mention specific game names like 'yeti frens', 'axie infinity', etc.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain network",
+                        "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"],
+                        "default": "ethereum"
+                    },
+                    "game": {
+                        "type": "string",
+                        "description": "Name of the game to fetch metrics for"
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for metrics (e.g., 24h, 7d, 30d)",
+                        "default": "24h"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of results to return",
+                        "default": 30
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    }
+                },
+                "required": ["game"]
+            }
+        }
+    }
+]
+
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": """You are an NFT Gaming Metrics Assistant. You help users get information about NFT gaming metrics using three main tools:
+
+1. get_game_contracts_info - Use this ONLY when users ask for general information about game contracts, lists of games, or overview data. This is for broad queries like "show me game contracts" or "list games".
+
+2. get_nft_gaming_metrics_by_contract - Use this when users provide a specific contract address (starts with 0x). This gets detailed metrics for a specific contract.
+
+3. get_nft_gaming_metrics_by_game - Use this when users mention a specific game name (like "yeti frens", "axie infinity", "cryptokitties", etc.). This gets metrics for a specific game.
+
+IMPORTANT: When users ask about a specific game by name, ALWAYS use get_nft_gaming_metrics_by_game, NOT get_game_contracts_info.
+
+You can work with these blockchains: avalanche, base, binance, bitcoin, berachain, ethereum, linea, polygon, solana, unichain.
+
+When users ask questions, determine which tool(s) to use and call them appropriately. Provide clear, helpful responses based on the data returned."""
+}
 
 class NFTGamingAgent:
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, fast_mode: bool = False):
         """
         Initialize the NFT Gaming Agent with API keys from .env file
         
         Args:
             verbose (bool): Enable verbose logging to see agent's thinking process
+            fast_mode (bool): Return a single small tool result as a Markdown table
+                instead of asking GPT-4o to phrase it
         """
         # Load environment variables from .env file
         load_dotenv()
@@ -29,128 +238,91 @@ class NFTGamingAgent:
         self.client = OpenAI(api_key=openai_api_key)
         self.api_key = unleash_api_key
         self.verbose = verbose
+        self.fast_mode = fast_mode
         self.base_url = "https://api.unleashnfts.com/api/v2/nft/gaming"
         
+        # Verbose output goes through logging so disabled messages are never formatted; levels and
+        # handlers are left to the application, and this instance only filters its own debug records
+        self._log = VerboseLog(log, verbose)
+        if verbose:
+            _start_metrics_server()
+        
+        self.session = unleash_session(self.api_key, pool_connections=10, pool_maxsize=20, retries=3, backoff_factor=0.4)
+        
+        # Responses of the idempotent GET endpoints by (url, params)
+        self._cache = TTLCache(_CACHE_MAX_ENTRIES, self._log)
+        
+        # LRU of blake2b(user_message) -> (decided_at, ((call_id, name, arguments_json), ...))
+        self._decision_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._decision_lock = threading.Lock()
+        
+        # Worker pool used to run the tool calls of a single GPT-4o turn concurrently
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nftgaming-tool")
+        
         # Supported blockchains
-        self.supported_blockchains = [
-            "avalanche", "base", "binance", "bitcoin", "berachain", 
-            "ethereum", "linea", "polygon", "solana", "unichain"
-        ]
+        self.supported_blockchains = _SUPPORTED_BLOCKCHAINS
         
         # Define the tools for OpenAI function calling
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_game_contracts_info",
-                    "description": "Get general overview of game contracts and metrics. Use ONLY for broad queries like 'show me game contracts' or 'list games'. DO NOT use for specific game names.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain network to filter results (optional)",
-                                "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"]
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of results to return (default: 30)",
-                                "default": 30
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination (default: 0)",
-                                "default": 0
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nft_gaming_metrics_by_contract",
-                    "description": "Fetch NFT gaming metrics for a specific contract address",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain network",
-                                "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"],
-                                "default": "ethereum"
-                            },
-                            "contract_address": {
-                                "type": "string",
-                                "description": "Contract address to fetch metrics for"
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for metrics (e.g., 24h, 7d, 30d)",
-                                "default": "24h"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of results to return",
-                                "default": 30
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            }
-                        },
-                        "required": ["contract_address"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nft_gaming_metrics_by_game",
-                    "description": "Fetch NFT gaming metrics for a specific game by name. Use this when users mention specific game names like 'yeti frens', 'axie infinity', etc.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain network",
-                                "enum": ["avalanche", "base", "binance", "bitcoin", "berachain", "ethereum", "linea", "polygon", "solana", "unichain"],
-                                "default": "ethereum"
-                            },
-                            "game": {
-                                "type": "string",
-                                "description": "Name of the game to fetch metrics for"
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for metrics (e.g., 24h, 7d, 30d)",
-                                "default": "24h"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Number of results to return",
-                                "default": 30
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            }
-                        },
-                        "required": ["game"]
-                    }
-                }
-            }
-        ]
+        self.tools = _TOOLS
+
+    def warmup(self) -> None:
+        """Open a pooled connection to the API host so the first query skips the TCP/TLS handshake"""
+        try:
+            self.session.head(self.base_url, timeout=5.0)
+        except requests.exceptions.RequestException as e:
+            self._log.debug("⚠️ Warmup request failed: %s", e)
+
+    def close(self) -> None:
+        """Release the pooled HTTP connections and tool-call worker threads"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self) -> "NFTGamingAgent":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _fetch(self, path: str, params: Dict[str, Any], ttl: float) -> Dict[str, Any]:
+        """GET an endpoint under base_url, returning the decoded JSON or an error dict"""
+        url = self.base_url + path
+        
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
+        
+        try:
+            return self._cached_get(url, params, ttl, endpoint=path)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            error_result = {"error": f"API request failed: {str(e)}"}
+            self._log.debug("❌ API ERROR: %s", error_result)
+            return error_result
+
+    def _cached_get(self, url: str, params: Dict[str, Any], ttl: float, endpoint: str) -> Dict[str, Any]:
+        """GET url with params, serving repeats from the in-process TTL cache"""
+        def fetch() -> Dict[str, Any]:
+            with API_LATENCY.labels(endpoint).time():
+                response = self.session.get(url, params=params, timeout=_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            result = loads(response.content)
+            
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("✅ API RESPONSE: Status %d", response.status_code)
+                self._log.debug("📄 RESPONSE SIZE: %d bytes", len(response.content))
+                data = result.get('data') if isinstance(result, dict) else None
+                if data is not None:
+                    self._log.debug("📈 DATA ITEMS: %d items returned", len(data))
+            return result
+        
+        return self._cache.get_or_fetch(
+            (url, frozenset(params.items())), ttl, fetch, f"GET {url}",
+            on_hit=CACHE_HITS.labels(endpoint).inc
+        )
 
     def get_game_contracts_info(self, limit: int = 30, offset: int = 0, blockchain: Optional[str] = None) -> Dict[str, Any]:
         """Get detailed information on game contracts"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_game_contracts_info")
-            print(f"📥 INPUT PARAMETERS: limit={limit}, offset={offset}, blockchain={blockchain}")
+        self._log.debug("🔧 TOOL CALL: get_game_contracts_info")
+        self._log.debug("📥 INPUT PARAMETERS: limit=%s, offset=%s, blockchain=%s", limit, offset, blockchain)
         
-        url = f"{self.base_url}/metrics"
         params = {
             "offset": offset,
             "limit": limit,
@@ -162,32 +334,7 @@ class NFTGamingAgent:
         if blockchain:
             params["blockchain"] = blockchain
         
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
-        
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
-            error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
-            return error_result
+        return self._fetch("/metrics", params, ttl=300)
 
     def get_nft_gaming_metrics_by_contract(
         self, 
@@ -198,16 +345,17 @@ class NFTGamingAgent:
         offset: int = 0
     ) -> Dict[str, Any]:
         """Fetch NFT gaming metrics by contract address"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_nft_gaming_metrics_by_contract")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - contract_address: {contract_address}")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - time_range: {time_range}")
-            print(f"   - limit: {limit}")
-            print(f"   - offset: {offset}")
+        self._log.debug(
+            "🔧 TOOL CALL: get_nft_gaming_metrics_by_contract\n"
+            "📥 INPUT PARAMETERS:\n"
+            "   - contract_address: %s\n"
+            "   - blockchain: %s\n"
+            "   - time_range: %s\n"
+            "   - limit: %s\n"
+            "   - offset: %s",
+            contract_address, blockchain, time_range, limit, offset
+        )
         
-        url = f"{self.base_url}/contract/metrics"
         params = {
             "blockchain": blockchain,
             "contract_address": contract_address,
@@ -217,32 +365,8 @@ class NFTGamingAgent:
             "sort_by": "total_users",
             "sort_order": "desc"
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
-        
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
-            error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
-            return error_result
+        return self._fetch("/contract/metrics", params, ttl=_CACHE_TTLS.get(time_range, 300))
 
     def get_nft_gaming_metrics_by_game(
         self, 
@@ -253,19 +377,20 @@ class NFTGamingAgent:
         offset: int = 0
     ) -> Dict[str, Any]:
         """Fetch NFT gaming metrics by game name"""
-        # Convert game name to lowercase for API compatibility
-        game_formatted = game.lower()
+        # Normalize game name (ASCII lowercase, single spaces) for API compatibility
+        game_formatted = _WS.sub(" ", game.strip()).translate(_ASCII_LOWER)
         
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_nft_gaming_metrics_by_game")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - game: {game} → formatted: {game_formatted}")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - time_range: {time_range}")
-            print(f"   - limit: {limit}")
-            print(f"   - offset: {offset}")
+        self._log.debug(
+            "🔧 TOOL CALL: get_nft_gaming_metrics_by_game\n"
+            "📥 INPUT PARAMETERS:\n"
+            "   - game: %s → formatted: %s\n"
+            "   - blockchain: %s\n"
+            "   - time_range: %s\n"
+            "   - limit: %s\n"
+            "   - offset: %s",
+            game, game_formatted, blockchain, time_range, limit, offset
+        )
         
-        url = f"{self.base_url}/collection/metrics"
         params = {
             "blockchain": blockchain,
             "game": game_formatted,  # Use the lowercase formatted name
@@ -275,38 +400,15 @@ class NFTGamingAgent:
             "sort_by": "total_users",
             "sort_order": "desc"
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
-            error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
-            return error_result
+        return self._fetch("/collection/metrics", params, ttl=_CACHE_TTLS.get(time_range, 300))
 
     def execute_function_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the appropriate function based on the function call"""
-        if self.verbose:
-            print(f"\n🎯 EXECUTING FUNCTION: {function_name}")
-            print(f"🔍 FUNCTION ARGUMENTS: {json.dumps(arguments, indent=2)}")
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("\n🎯 EXECUTING FUNCTION: %s", function_name)
+            self._log.debug("🔍 FUNCTION ARGUMENTS: %s", json.dumps(arguments, indent=2))
+        TOOL_INVOCATIONS.labels(function_name).inc()
         
         if function_name == "get_game_contracts_info":
             return self.get_game_contracts_info(**arguments)
@@ -316,139 +418,186 @@ class NFTGamingAgent:
             return self.get_nft_gaming_metrics_by_game(**arguments)
         else:
             error_result = {"error": f"Unknown function: {function_name}"}
-            if self.verbose:
-                print(f"❌ FUNCTION ERROR: {error_result}")
+            self._log.debug("❌ FUNCTION ERROR: %s", error_result)
             return error_result
 
-    def chat(self, user_message: str) -> str:
+    def _get_cached_decision(self, key: str) -> Optional[Tuple[Tuple[str, str, str], ...]]:
+        """Return the tool calls GPT-4o chose for this query recently, if still fresh"""
+        with self._decision_lock:
+            entry = self._decision_cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= _DECISION_TTL:
+                del self._decision_cache[key]
+                return None
+            self._decision_cache.move_to_end(key)
+            return entry[1]
+
+    def _store_decision(self, key: str, tool_calls: Tuple[Tuple[str, str, str], ...]) -> None:
+        """Remember the tool calls GPT-4o chose for a query"""
+        with self._decision_lock:
+            self._decision_cache[key] = (time.monotonic(), tool_calls)
+            self._decision_cache.move_to_end(key)
+            if len(self._decision_cache) > _DECISION_CACHE_MAX_ENTRIES:
+                self._decision_cache.popitem(last=False)
+
+    def _run_tool_call(self, index: int, tool_call: Tuple[str, str, str]) -> Dict[str, Any]:
+        """Execute a single (call_id, function_name, arguments_json) tool call"""
+        call_id, function_name, arguments_json = tool_call
+        self._log.debug(
+            "\n📞 TOOL CALL #%d:\n🔧 Function: %s\n🆔 Call ID: %s",
+            index, function_name, call_id
+        )
+        
+        # A failing call becomes an error result so the other concurrent calls still land
+        try:
+            function_args = loads(arguments_json)
+            function_result = self.execute_function_call(function_name, function_args)
+        except Exception as e:
+            function_result = {"error": f"Tool execution failed: {str(e)}"}
+            self._log.debug("❌ TOOL #%d FAILED: %s", index, function_result)
+        
+        self._log.debug("✨ TOOL #%d EXECUTION COMPLETED", index)
+        
+        return function_result
+
+    def chat(self, user_message: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Process a natural language query and return relevant NFT gaming data
         
         Args:
             user_message (str): Natural language query from the user
+            on_token (Callable[[str], None], optional): Called with each piece of the
+                response as it arrives, so callers can print it incrementally
             
         Returns:
             str: Formatted response with the requested data
         """
-        if self.verbose:
-            print(f"\n" + "="*60)
-            print(f"🧠 AGENT THINKING PROCESS")
-            print(f"="*60)
-            print(f"💬 USER QUERY: {user_message}")
-            print(f"🤖 Analyzing query and determining appropriate tools...")
+        self._log.debug("\n%s\n🧠 AGENT THINKING PROCESS\n%s", "=" * 60, "=" * 60)
+        self._log.debug("💬 USER QUERY: %s", user_message)
+        self._log.debug("🤖 Analyzing query and determining appropriate tools...")
         
         try:
             # Create the initial conversation with system prompt
             messages = [
-                {
-                    "role": "system",
-                    "content": """You are an NFT Gaming Metrics Assistant. You help users get information about NFT gaming metrics using three main tools:
-
-1. get_game_contracts_info - Use this ONLY when users ask for general information about game contracts, lists of games, or overview data. This is for broad queries like "show me game contracts" or "list games".
-
-2. get_nft_gaming_metrics_by_contract - Use this when users provide a specific contract address (starts with 0x). This gets detailed metrics for a specific contract.
-
-3. get_nft_gaming_metrics_by_game - Use this when users mention a specific game name (like "yeti frens", "axie infinity", "cryptokitties", etc.). This gets metrics for a specific game.
-
-IMPORTANT: When users ask about a specific game by name, ALWAYS use get_nft_gaming_metrics_by_game, NOT get_game_contracts_info.
-
-You can work with these blockchains: avalanche, base, binance, bitcoin, berachain, ethereum, linea, polygon, solana, unichain.
-
-When users ask questions, determine which tool(s) to use and call them appropriately. Provide clear, helpful responses based on the data returned."""
-                },
+                _SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": user_message
                 }
             ]
 
-            if self.verbose:
-                print(f"🔄 Making initial request to GPT-4o...")
+            # Identical queries reuse a fresh routing decision instead of asking GPT-4o again
+            decision_key = hashlib.blake2b(user_message.encode(), digest_size=16).hexdigest()
+            tool_calls = self._get_cached_decision(decision_key)
+            
+            if tool_calls is not None:
+                self._log.debug("⚡ DECISION CACHE HIT: reusing %d tool call(s)", len(tool_calls))
+            else:
+                self._log.debug("🔄 Making initial request to GPT-4o...")
 
-            # Make the initial API call to GPT-4o
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                tools=self.tools,
-                tool_choice="auto"
-            )
+                # Make the initial API call to GPT-4o
+                with API_LATENCY.labels("gpt-4o:tools").time():
+                    response = self.client.chat.completions.create(
+                        model="gpt-4o",
+                        messages=messages,
+                        tools=self.tools,
+                        tool_choice="auto"
+                    )
 
-            if self.verbose:
-                print(f"📤 GPT-4o RESPONSE RECEIVED")
-                if response.choices[0].message.tool_calls:
-                    print(f"🛠️  GPT-4o wants to call {len(response.choices[0].message.tool_calls)} tool(s)")
-                else:
-                    print(f"💭 GPT-4o provided direct response (no tools needed)")
-
-            # Check if the model wants to call a function
-            if response.choices[0].message.tool_calls:
-                # Add the assistant's response to messages
-                messages.append(response.choices[0].message)
+                message = response.choices[0].message
+                self._log.debug("📤 GPT-4o RESPONSE RECEIVED")
                 
-                # Process each tool call
-                for i, tool_call in enumerate(response.choices[0].message.tool_calls):
-                    if self.verbose:
-                        print(f"\n📞 TOOL CALL #{i+1}:")
-                        print(f"🔧 Function: {tool_call.function.name}")
-                        print(f"🆔 Call ID: {tool_call.id}")
-                    
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Execute the function
-                    function_result = self.execute_function_call(function_name, function_args)
+                if not message.tool_calls:
+                    # No function call needed, return the direct response
+                    self._log.debug("💭 GPT-4o provided direct response (no tools needed)")
+                    direct_response = message.content
+                    if on_token and direct_response:
+                        on_token(direct_response)
                     
-                    if self.verbose:
-                        print(f"✨ TOOL EXECUTION COMPLETED")
-                        print(f"🔄 Adding result to conversation context...")
+                    self._log.debug("✅ DIRECT RESPONSE (no tools needed)")
+                    self._log.debug("📝 Response length: %d characters", len(direct_response or ""))
+                    self._log.debug("%s\n🎯 AGENT FINAL RESPONSE:\n%s", "=" * 60, "=" * 60)
                     
-                    # Add the function result to messages
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(function_result)
-                    })
-
-                if self.verbose:
-                    print(f"\n🔄 Sending results back to GPT-4o for final response...")
-
-                # Get the final response from GPT-4o
-                final_response = self.client.chat.completions.create(
+                    return direct_response
+                
+                tool_calls = tuple(
+                    (tc.id, tc.function.name, tc.function.arguments) for tc in message.tool_calls
+                )
+                self._store_decision(decision_key, tool_calls)
+                self._log.debug("🛠️  GPT-4o wants to call %d tool(s)", len(tool_calls))
+
+            # Add the assistant's tool-call turn to messages
+            messages.append({
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+                    for call_id, name, arguments in tool_calls
+                ]
+            })
+            
+            # Execute all tool calls concurrently; map() keeps results in call order
+            function_results = self._executor.map(
+                self._run_tool_call, range(1, len(tool_calls) + 1), tool_calls
+            )
+            
+            for tool_call, function_result in zip(tool_calls, function_results):
+                # Add the function result to messages
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call[0],
+                    "content": dumps(function_result)
+                })
+
+            # A single small tabular result is the answer; skip the second GPT-4o round trip
+            if self.fast_mode and len(tool_calls) == 1:
+                wants_summary = any(keyword in user_message.lower() for keyword in _SUMMARY_KEYWORDS)
+                if not wants_summary and len(messages[-1]["content"]) < _FAST_MODE_MAX_BYTES:
+                    table = _format_markdown_table(function_result)
+                    if table is not None:
+                        self._log.debug("⚡ FAST MODE: returning tool result without a second GPT-4o call")
+                        if on_token:
+                            on_token(table)
+                        return table
+
+            self._log.debug("\n🔄 Sending results back to GPT-4o for final response...")
+
+            # Stream the final response from GPT-4o so tokens surface as they are generated
+            parts = []
+            with API_LATENCY.labels("gpt-4o:final").time():
+                stream = self.client.chat.completions.create(
                     model="gpt-4o",
-                    messages=messages
+                    messages=messages,
+                    stream=True
                 )
                 
-                final_content = final_response.choices[0].message.content
-                
-                if self.verbose:
-                    print(f"✅ FINAL RESPONSE GENERATED")
-                    print(f"📝 Response length: {len(final_content)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
-                
-                return final_content
-            else:
-                # No function call needed, return the direct response
-                direct_response = response.choices[0].message.content
-                
-                if self.verbose:
-                    print(f"✅ DIRECT RESPONSE (no tools needed)")
-                    print(f"📝 Response length: {len(direct_response)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
-                
-                return direct_response
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        parts.append(delta)
+                        if on_token:
+                            on_token(delta)
+            final_content = "".join(parts)
+            
+            self._log.debug("✅ FINAL RESPONSE GENERATED")
+            self._log.debug("📝 Response length: %d characters", len(final_content))
+            self._log.debug("%s\n🎯 AGENT FINAL RESPONSE:\n%s", "=" * 60, "=" * 60)
+            
+            return final_content
 
         except Exception as e:
             error_msg = f"An error occurred: {str(e)}"
-            if self.verbose:
-                print(f"❌ CRITICAL ERROR: {error_msg}")
+            self._log.debug("❌ CRITICAL ERROR: %s", error_msg)
             return error_msg
 
 # Example usage
 if __name__ == "__main__":
+    # The REPL is the application here, so it decides where the verbose trace goes
+    enable_verbose_output(log.name)
+    
     # Initialize the agent (API keys will be loaded from .env file)
     try:
         # Set verbose=True to see the agent's thinking process
@@ -467,6 +616,8 @@ if __name__ == "__main__":
         "Get contract info but limit to 10 results",
     ]
     
+    agent.warmup()
+    
     print("NFT Gaming Metrics Agent - Ready to chat!")
     print("Type 'quit' to exit\n")
     
@@ -475,5 +626,6 @@ if __name__ == "__main__":
         if user_input.lower() in ['quit', 'exit', 'q']:
             break
             
-        response = agent.chat(user_input)
-        print(f"Agent: {response}\n")
\ No newline at end of file
+        print("Agent: ", end="", flush=True)
+        agent.chat(user_input, on_token=lambda token: print(token, end="", flush=True))
+        print("\n")
\ No newline at end of file
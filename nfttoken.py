@@ -1,18 +1,203 @@
 import requests
+import atexit
+import httpx
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
+import orjson
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
+from agentutils import (
+    RateLimiter, TTLCache, VerboseLog, chat_batch, dumps, enable_verbose_output, loads, unleash_session
+)
 import re
 
+log = logging.getLogger(__name__)
+
+# Response cache TTL (seconds) per endpoint: DEX prices move fast, metrics slowly
+_CACHE_TTL_METRICS = 600
+_CACHE_TTL_PREDICTION = 300
+_CACHE_TTL_DEX_PRICE = 60
+_CACHE_MAX_ENTRIES = 1024
+
+# Cap on 'data' rows forwarded to GPT-4o per tool result; prompt tokens drive cost and latency
+_TOOL_RESULT_MAX_ITEMS = 30
+
+def _slim_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim a tool result before it is sent back to GPT-4o: drop null fields and cap the rows"""
+    data = result.get("data") if isinstance(result, dict) else None
+    if not isinstance(data, list):
+        return result
+    
+    rows = [
+        {key: value for key, value in row.items() if value is not None} if isinstance(row, dict) else row
+        for row in data[:_TOOL_RESULT_MAX_ITEMS]
+    ]
+    slimmed = dict(result, data=rows)
+    if len(data) > _TOOL_RESULT_MAX_ITEMS:
+        slimmed["_truncated"] = True
+        slimmed["_total_items"] = len(data)
+    return slimmed
+
+# Shared, immutable agent configuration (built once per process, not per instance)
+_BLOCKCHAINS = ("avalanche", "ethereum", "base", "berachain", "linea", "polygon", "unichain")
+_TIME_RANGES = ("24h", "7d", "30d", "90d", "all")
+
+# Token contract address; also used to sniff queries for speculative fetches
+_ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+
+# Query sniffing for speculative fetches: one address, one chain, one unambiguous intent
+_BLOCKCHAIN_RE = re.compile(r"\b(" + "|".join(_BLOCKCHAINS) + r")\b")
+_INTENT_KEYWORDS = (
+    ("get_token_price_prediction", ("predict", "forecast", "estimate", "future", "volatility")),
+    ("get_token_dex_price", ("dex", "real-time", "current price", "market price", "decentralized")),
+    ("get_token_metrics", ("metric", "performance", "metadata", "insight", "market data"))
+)
+
+_TOOLS = (
+    {
+        "type": "function",
+        "function": {
+            "name": "get_token_metrics",
+            "description": "Get key metrics and metadata for a specified token. Use this when users ask for token metrics, token performance, token metadata, token insights, or token market data.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain for the token",
+                        "enum": list(_BLOCKCHAINS)
+                    },
+                    "token_address": {
+                        "type": "string",
+                        "description": "The token contract address"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["blockchain", "token_address"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_token_price_prediction",
+            "description": "Get token price prediction with key market indicators and volatility trends. Use this when users ask for price predictions, price forecasts, price estimates, or future price movements.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "token_address": {
+                        "type": "string",
+                        "description": "The token contract address"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["token_address"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_token_dex_price",
+            "description": "Get the USD price of an ERC-20 token from decentralized exchanges (DEXs). Use this when users ask for DEX prices, real-time pricing, current token price, or market prices.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain for the token",
+                        "enum": list(_BLOCKCHAINS)
+                    },
+                    "token_address": {
+                        "type": "string",
+                        "description": "The token contract address"
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for price data",
+                        "enum": list(_TIME_RANGES),
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["blockchain", "token_address"]
+            }
+        }
+    }
+)
+
+# System prompt shared by every chat turn (built once per process, not per call)
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": """You are an NFT Token Analytics Assistant. You help users get information about token metrics, price predictions, and DEX prices using three main tools:
+
+1. get_token_metrics - Use this when users ask for token metrics, token performance, token metadata, token insights, or token market data. This provides key metrics and metadata for a specified token.
+
+2. get_token_price_prediction - Use this when users ask for price predictions, price forecasts, price estimates, future price movements, or volatility trends. This provides token price prediction with key market indicators.
+
+3. get_token_dex_price - Use this when users ask for DEX prices, real-time pricing, current token price, market prices, or decentralized exchange prices. This provides the USD price of an ERC-20 token from DEXs.
+
+IMPORTANT: 
+- If users ask for "metrics", "performance", "metadata", "insights", "market data" → use get_token_metrics
+- If users ask for "prediction", "forecast", "estimate", "future", "volatility" → use get_token_price_prediction
+- If users ask for "DEX price", "real-time", "current price", "market price", "decentralized" → use get_token_dex_price
+
+Supported blockchains: avalanche, ethereum, base, berachain, linea, polygon, unichain
+Supported time ranges: 24h, 7d, 30d, 90d, all
+
+When users ask questions, determine which tool(s) to use and call them appropriately. If a question needs several tools (for example metrics, a forecast and the DEX price for the same token), request all of those tool calls together in a single response rather than one at a time. Provide clear, helpful responses based on the data returned."""
+}
+
 class NFTTokenAgent:
-    def __init__(self, verbose: bool = True):
+    def __init__(
+        self,
+        verbose: bool = True,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        speculative_fetch: bool = False
+    ):
         """
         Initialize the NFT Token Analytics Agent with API keys from .env file
         
         Args:
             verbose (bool): Enable verbose logging to see agent's thinking process
+            max_concurrency (int, optional): Most Unleash API requests in flight at once
+                (defaults to NFT_MAX_CONC or 10)
+            requests_per_minute (int, optional): Unleash API request budget per minute
+                (defaults to NFT_RPM or 300)
+            speculative_fetch (bool): Start the fetch an unambiguous query obviously needs
+                while GPT-4o is still choosing tools
         """
         # Load environment variables from .env file
         load_dotenv()
@@ -26,119 +211,93 @@ class NFTTokenAgent:
         if not unleash_api_key:
             raise ValueError("UNLEASH_NFTS_API_KEY not found in .env file")
         
-        self.client = OpenAI(api_key=openai_api_key)
+        # Long-lived HTTP/2 keep-alive pool to api.openai.com, reused across chat turns
+        self._openai_http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=30),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        atexit.register(self._openai_http.close)
+        self.client = OpenAI(api_key=openai_api_key, http_client=self._openai_http)
         self.api_key = unleash_api_key
         self.verbose = verbose
         self.base_url = "https://api.unleashnfts.com/api/v2/token"
         
+        # Verbose output goes through logging so disabled messages are never formatted; levels and
+        # handlers are left to the application, and this instance only filters its own debug records
+        self._log = VerboseLog(log, verbose)
+        
+        # Endpoint URLs are fixed per agent, so build them once instead of per call
+        self._urls = {
+            "metrics": f"{self.base_url}/metrics",
+            "prediction": f"{self.base_url}/price_prediction",
+            "dex": f"{self.base_url}/dex_price"
+        }
+        
+        self.session = unleash_session(self.api_key, pool_connections=16, pool_maxsize=32, retries=5, backoff_factor=0.3)
+        
+        # Bound parallel fan-out so a large tool wave cannot trip the API's rate limits
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("NFT_MAX_CONC", "10"))
+        if requests_per_minute is None:
+            requests_per_minute = int(os.getenv("NFT_RPM", "300"))
+        self._request_slots = threading.BoundedSemaphore(max_concurrency)
+        self._rate_limiter = RateLimiter(requests_per_minute, 60.0)
+        
+        # Responses of the idempotent GET endpoints by (url, params)
+        self._cache = TTLCache(_CACHE_MAX_ENTRIES, self._log)
+        
+        # Worker pool used to run the tool calls of a single GPT-4o turn concurrently
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nfttoken-tool")
+        
+        # Off by default: a wrong guess spends an Unleash request from the rate budget
+        self.speculative_fetch = speculative_fetch
+        
         # Supported blockchains for token analytics
-        self.supported_blockchains = [
-            "avalanche", "ethereum", "base", "berachain", "linea", "polygon", "unichain"
-        ]
+        self.supported_blockchains = list(_BLOCKCHAINS)
         
         # Supported time ranges
-        self.supported_time_ranges = ["24h", "7d", "30d", "90d", "all"]
+        self.supported_time_ranges = list(_TIME_RANGES)
+        
+        # O(1) lookups for rejecting bad inputs before they cost an API round trip
+        self._blockchains = frozenset(_BLOCKCHAINS)
+        self._time_ranges = frozenset(_TIME_RANGES)
         
         # Define the tools for OpenAI function calling
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_token_metrics",
-                    "description": "Get key metrics and metadata for a specified token. Use this when users ask for token metrics, token performance, token metadata, token insights, or token market data.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain for the token",
-                                "enum": ["avalanche", "ethereum", "base", "berachain", "linea", "polygon", "unichain"]
-                            },
-                            "token_address": {
-                                "type": "string",
-                                "description": "The token contract address"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["blockchain", "token_address"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_token_price_prediction",
-                    "description": "Get token price prediction with key market indicators and volatility trends. Use this when users ask for price predictions, price forecasts, price estimates, or future price movements.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "token_address": {
-                                "type": "string",
-                                "description": "The token contract address"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["token_address"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_token_dex_price",
-                    "description": "Get the USD price of an ERC-20 token from decentralized exchanges (DEXs). Use this when users ask for DEX prices, real-time pricing, current token price, or market prices.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain for the token",
-                                "enum": ["avalanche", "ethereum", "base", "berachain", "linea", "polygon", "unichain"]
-                            },
-                            "token_address": {
-                                "type": "string",
-                                "description": "The token contract address"
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for price data",
-                                "enum": ["24h", "7d", "30d", "90d", "all"],
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["blockchain", "token_address"]
-                    }
-                }
-            }
-        ]
+        self.tools = _TOOLS
+        
+        # Tool name -> bound fetcher, so dispatch is a single dict lookup
+        self._dispatch: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "get_token_metrics": self.get_token_metrics,
+            "get_token_price_prediction": self.get_token_price_prediction,
+            "get_token_dex_price": self.get_token_dex_price
+        }
+
+    def _cached_get(self, url: str, params: Dict[str, Any], ttl: float) -> Dict[str, Any]:
+        """GET url with params, serving repeats from the TTL cache and sharing in-flight requests"""
+        def fetch() -> Dict[str, Any]:
+            self._rate_limiter.acquire()
+            with self._request_slots:
+                response = self.session.get(url, params=params, timeout=(3, 30))
+            response.raise_for_status()
+            result = loads(response.content)
+            
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("✅ API RESPONSE: Status %s", response.status_code)
+                self._log.debug("📦 CONTENT ENCODING: %s", response.headers.get('content-encoding', 'identity'))
+                self._log.debug("📄 RESPONSE SIZE: %s bytes", len(response.content))
+                data = result.get('data') if isinstance(result, dict) else None
+                if data is not None:
+                    self._log.debug("📈 DATA ITEMS: %s items returned", len(data))
+            return result
+        
+        return self._cache.get_or_fetch((url, frozenset(params.items())), ttl, fetch, f"GET {url}")
+
+    def _input_error(self, message: str) -> Dict[str, Any]:
+        """Build the error result for a tool call rejected before reaching the API"""
+        error_result = {"error": message}
+        self._log.debug("❌ INPUT ERROR: %s", error_result)
+        return error_result
 
     def get_token_metrics(
         self, 
@@ -148,46 +307,37 @@ class NFTTokenAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get key metrics and metadata for a specified token"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_token_metrics")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - token_address: {token_address}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
-        
-        url = f"{self.base_url}/metrics"
+        self._log.debug("🔧 TOOL CALL: get_token_metrics")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - blockchain: %s", blockchain)
+        self._log.debug("   - token_address: %s", token_address)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        if blockchain not in self._blockchains:
+            return self._input_error(f"Unsupported blockchain: {blockchain}")
+        if not _ADDRESS_RE.fullmatch(token_address):
+            return self._input_error(f"Invalid token_address: {token_address}")
+        
+        # Addresses are case-insensitive; normalize so equivalent queries share cache entries
+        token_address = token_address.lower()
+        
+        url = self._urls["metrics"]
         params = {
             "blockchain": blockchain,
             "token_address": token_address,
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params, ttl=_CACHE_TTL_METRICS)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def get_token_price_prediction(
@@ -197,44 +347,33 @@ class NFTTokenAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get token price prediction with key market indicators and volatility trends"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_token_price_prediction")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - token_address: {token_address}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
-        
-        url = f"{self.base_url}/price_prediction"
+        self._log.debug("🔧 TOOL CALL: get_token_price_prediction")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - token_address: %s", token_address)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        if not _ADDRESS_RE.fullmatch(token_address):
+            return self._input_error(f"Invalid token_address: {token_address}")
+        
+        # Addresses are case-insensitive; normalize so equivalent queries share cache entries
+        token_address = token_address.lower()
+        
+        url = self._urls["prediction"]
         params = {
             "token_address": token_address,
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params, ttl=_CACHE_TTL_PREDICTION)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def get_token_dex_price(
@@ -246,16 +385,25 @@ class NFTTokenAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get the USD price of an ERC-20 token from decentralized exchanges (DEXs)"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_token_dex_price")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - token_address: {token_address}")
-            print(f"   - time_range: {time_range}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
-        
-        url = f"{self.base_url}/dex_price"
+        self._log.debug("🔧 TOOL CALL: get_token_dex_price")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - blockchain: %s", blockchain)
+        self._log.debug("   - token_address: %s", token_address)
+        self._log.debug("   - time_range: %s", time_range)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        if blockchain not in self._blockchains:
+            return self._input_error(f"Unsupported blockchain: {blockchain}")
+        if time_range not in self._time_ranges:
+            return self._input_error(f"Unsupported time_range: {time_range}")
+        if not _ADDRESS_RE.fullmatch(token_address):
+            return self._input_error(f"Invalid token_address: {token_address}")
+        
+        # Addresses are case-insensitive; normalize so equivalent queries share cache entries
+        token_address = token_address.lower()
+        
+        url = self._urls["dex"]
         params = {
             "blockchain": blockchain,
             "token_address": token_address,
@@ -263,50 +411,70 @@ class NFTTokenAgent:
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params, ttl=_CACHE_TTL_DEX_PRICE)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def execute_function_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the appropriate function based on the function call"""
-        if self.verbose:
-            print(f"\n🎯 EXECUTING FUNCTION: {function_name}")
-            print(f"🔍 FUNCTION ARGUMENTS: {json.dumps(arguments, indent=2)}")
-        
-        if function_name == "get_token_metrics":
-            return self.get_token_metrics(**arguments)
-        elif function_name == "get_token_price_prediction":
-            return self.get_token_price_prediction(**arguments)
-        elif function_name == "get_token_dex_price":
-            return self.get_token_dex_price(**arguments)
-        else:
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("\n🎯 EXECUTING FUNCTION: %s", function_name)
+            self._log.debug("🔍 FUNCTION ARGUMENTS: %s", json.dumps(arguments, indent=2))
+        
+        function = self._dispatch.get(function_name)
+        if function is None:
             error_result = {"error": f"Unknown function: {function_name}"}
-            if self.verbose:
-                print(f"❌ FUNCTION ERROR: {error_result}")
+            self._log.debug("❌ FUNCTION ERROR: %s", error_result)
             return error_result
+        
+        return function(**arguments)
+
+    def _sniff_intent(self, user_message: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Guess the single tool call a query obviously needs, or None when it is not clear-cut"""
+        addresses = set(address.lower() for address in _ADDRESS_RE.findall(user_message))
+        if len(addresses) != 1:
+            return None
+        
+        text = user_message.lower()
+        intents = [name for name, keywords in _INTENT_KEYWORDS if any(keyword in text for keyword in keywords)]
+        if len(intents) != 1:
+            return None
+        
+        arguments: Dict[str, Any] = {"token_address": addresses.pop()}
+        if intents[0] != "get_token_price_prediction":
+            blockchains = set(_BLOCKCHAIN_RE.findall(text))
+            if len(blockchains) != 1:
+                return None
+            arguments["blockchain"] = blockchains.pop()
+        
+        return intents[0], arguments
+
+    def _run_tool_call(self, index: int, tool_call: Any) -> Dict[str, Any]:
+        """Execute a single tool call requested by GPT-4o"""
+        self._log.debug("\n📞 TOOL CALL #%s:", index)
+        self._log.debug("🔧 Function: %s", tool_call.function.name)
+        self._log.debug("🆔 Call ID: %s", tool_call.id)
+        
+        function_name = tool_call.function.name
+        
+        # A failing call becomes an error result so the other concurrent calls still land
+        try:
+            function_args = loads(tool_call.function.arguments)
+            function_result = self.execute_function_call(function_name, function_args)
+        except Exception as e:
+            function_result = {"error": f"Tool execution failed: {str(e)}"}
+            self._log.debug("❌ TOOL #%s FAILED: %s", index, function_result)
+        
+        self._log.debug("✨ TOOL #%s EXECUTION COMPLETED", index)
+        
+        return function_result
 
     def chat(self, user_message: str) -> str:
         """
@@ -318,129 +486,155 @@ class NFTTokenAgent:
         Returns:
             str: Formatted response with the requested data
         """
-        if self.verbose:
-            print(f"\n" + "="*60)
-            print(f"🧠 AGENT THINKING PROCESS")
-            print(f"="*60)
-            print(f"💬 USER QUERY: {user_message}")
-            print(f"🤖 Analyzing query and determining appropriate tools...")
+        return "".join(self.chat_stream(user_message))
+
+    def chat_stream(self, user_message: str) -> Iterator[str]:
+        """
+        Process a natural language query, yielding the response as GPT-4o generates it
+        
+        Args:
+            user_message (str): Natural language query from the user
+            
+        Yields:
+            str: Successive pieces of the formatted response
+        """
+        self._log.debug("\n%s", "=" * 60)
+        self._log.debug("🧠 AGENT THINKING PROCESS")
+        self._log.debug("%s", "=" * 60)
+        self._log.debug("💬 USER QUERY: %s", user_message)
+        self._log.debug("🤖 Analyzing query and determining appropriate tools...")
         
         try:
             # Create the initial conversation with system prompt
             messages = [
-                {
-                    "role": "system",
-                    "content": """You are an NFT Token Analytics Assistant. You help users get information about token metrics, price predictions, and DEX prices using three main tools:
-
-1. get_token_metrics - Use this when users ask for token metrics, token performance, token metadata, token insights, or token market data. This provides key metrics and metadata for a specified token.
-
-2. get_token_price_prediction - Use this when users ask for price predictions, price forecasts, price estimates, future price movements, or volatility trends. This provides token price prediction with key market indicators.
-
-3. get_token_dex_price - Use this when users ask for DEX prices, real-time pricing, current token price, market prices, or decentralized exchange prices. This provides the USD price of an ERC-20 token from DEXs.
-
-IMPORTANT: 
-- If users ask for "metrics", "performance", "metadata", "insights", "market data" → use get_token_metrics
-- If users ask for "prediction", "forecast", "estimate", "future", "volatility" → use get_token_price_prediction
-- If users ask for "DEX price", "real-time", "current price", "market price", "decentralized" → use get_token_dex_price
-
-Supported blockchains: avalanche, ethereum, base, berachain, linea, polygon, unichain
-Supported time ranges: 24h, 7d, 30d, 90d, all
-
-When users ask questions, determine which tool(s) to use and call them appropriately. Provide clear, helpful responses based on the data returned."""
-                },
+                _SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": user_message
                 }
             ]
 
-            if self.verbose:
-                print(f"🔄 Making initial request to GPT-4o...")
+            # Start the obvious fetch while GPT-4o decides; the real tool call then joins the
+            # in-flight request or hits the cache, and an unused result just stays cached
+            hint = self._sniff_intent(user_message) if self.speculative_fetch else None
+            if hint is not None:
+                self._log.debug("🔮 SPECULATIVE FETCH: %s %s", hint[0], hint[1])
+                self._executor.submit(self._dispatch[hint[0]], **hint[1])
+
+            self._log.debug("🔄 Making initial request to GPT-4o...")
 
             # Make the initial API call to GPT-4o
             response = self.client.chat.completions.create(
                 model="gpt-4o",
                 messages=messages,
                 tools=self.tools,
-                tool_choice="auto"
+                tool_choice="auto",
+                # All tool calls come back in one wave and run concurrently on the worker pool
+                parallel_tool_calls=True
             )
 
-            if self.verbose:
-                print(f"📤 GPT-4o RESPONSE RECEIVED")
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("📤 GPT-4o RESPONSE RECEIVED")
                 if response.choices[0].message.tool_calls:
-                    print(f"🛠️  GPT-4o wants to call {len(response.choices[0].message.tool_calls)} tool(s)")
+                    self._log.debug("🛠️  GPT-4o wants to call %s tool(s)", len(response.choices[0].message.tool_calls))
                 else:
-                    print(f"💭 GPT-4o provided direct response (no tools needed)")
+                    self._log.debug("💭 GPT-4o provided direct response (no tools needed)")
 
             # Check if the model wants to call a function
             if response.choices[0].message.tool_calls:
                 # Add the assistant's response to messages
                 messages.append(response.choices[0].message)
                 
-                # Process each tool call
-                for i, tool_call in enumerate(response.choices[0].message.tool_calls):
-                    if self.verbose:
-                        print(f"\n📞 TOOL CALL #{i+1}:")
-                        print(f"🔧 Function: {tool_call.function.name}")
-                        print(f"🆔 Call ID: {tool_call.id}")
-                    
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Execute the function
-                    function_result = self.execute_function_call(function_name, function_args)
-                    
-                    if self.verbose:
-                        print(f"✨ TOOL EXECUTION COMPLETED")
-                        print(f"🔄 Adding result to conversation context...")
-                    
+                # Execute all tool calls concurrently; map() keeps results in call order
+                tool_calls = response.choices[0].message.tool_calls
+                function_results = self._executor.map(
+                    self._run_tool_call, range(1, len(tool_calls) + 1), tool_calls
+                )
+                
+                for tool_call, function_result in zip(tool_calls, function_results):
                     # Add the function result to messages
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": json.dumps(function_result)
+                        "content": dumps(_slim_result(function_result))
                     })
 
-                if self.verbose:
-                    print(f"\n🔄 Sending results back to GPT-4o for final response...")
+                self._log.debug("\n🔄 Sending results back to GPT-4o for final response...")
 
-                # Get the final response from GPT-4o
-                final_response = self.client.chat.completions.create(
+                # Stream the final response from GPT-4o so tokens surface as they are generated
+                stream = self.client.chat.completions.create(
                     model="gpt-4o",
-                    messages=messages
+                    messages=messages,
+                    stream=True
                 )
                 
-                final_content = final_response.choices[0].message.content
+                response_length = 0
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        response_length += len(delta)
+                        yield delta
                 
-                if self.verbose:
-                    print(f"✅ FINAL RESPONSE GENERATED")
-                    print(f"📝 Response length: {len(final_content)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
-                
-                return final_content
+                self._log.debug("\n✅ FINAL RESPONSE GENERATED")
+                self._log.debug("📝 Response length: %s characters", response_length)
+                self._log.debug("%s", "=" * 60)
+                self._log.debug("🎯 AGENT FINAL RESPONSE:")
+                self._log.debug("%s", "=" * 60)
             else:
                 # No function call needed, return the direct response
                 direct_response = response.choices[0].message.content
                 
-                if self.verbose:
-                    print(f"✅ DIRECT RESPONSE (no tools needed)")
-                    print(f"📝 Response length: {len(direct_response)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
+                self._log.debug("✅ DIRECT RESPONSE (no tools needed)")
+                self._log.debug("📝 Response length: %s characters", len(direct_response or ""))
+                self._log.debug("%s", "=" * 60)
+                self._log.debug("🎯 AGENT FINAL RESPONSE:")
+                self._log.debug("%s", "=" * 60)
                 
-                return direct_response
+                yield direct_response or ""
 
         except Exception as e:
             error_msg = f"An error occurred: {str(e)}"
-            if self.verbose:
-                print(f"❌ CRITICAL ERROR: {error_msg}")
-            return error_msg
+            self._log.debug("❌ CRITICAL ERROR: %s", error_msg)
+            yield error_msg
+
+    def _run_batch_tool_call(self, user_message: str, tool_call: Dict[str, Any]) -> str:
+        """Execute one tool call from a batch response as tool message content, turning failures into an error result"""
+        try:
+            function_args = loads(tool_call["function"]["arguments"])
+            function_result = self.execute_function_call(tool_call["function"]["name"], function_args)
+        except Exception as e:
+            function_result = {"error": f"Tool execution failed: {str(e)}"}
+        return dumps(_slim_result(function_result))
+
+    def chat_batch(self, user_messages: List[str], poll_interval: float = 30.0) -> List[str]:
+        """
+        Answer many queries offline through the OpenAI Batch API (lower cost, results within 24h)
+        
+        Args:
+            user_messages (List[str]): Natural language queries from the user
+            poll_interval (float): Seconds to wait before the first batch status check
+            
+        Returns:
+            List[str]: One response per query, in the same order as user_messages
+        """
+        return chat_batch(
+            self.client,
+            user_messages,
+            _SYSTEM_MSG,
+            lambda user_message: self.tools,
+            self._run_batch_tool_call,
+            self._executor,
+            self._log,
+            poll_interval
+        )
 
 # Example usage
 if __name__ == "__main__":
+    # The REPL is the application here, so it decides where the verbose trace goes
+    enable_verbose_output(log.name)
+    
     # Initialize the agent (API keys will be loaded from .env file)
     try:
         # Set verbose=True to see the agent's thinking process
@@ -467,5 +661,7 @@ if __name__ == "__main__":
         if user_input.lower() in ['quit', 'exit', 'q']:
             break
             
-        response = agent.chat(user_input)
-        print(f"Agent: {response}\n") 
\ No newline at end of file
+        print("Agent: ", end="", flush=True)
+        for token in agent.chat_stream(user_input):
+            print(token, end="", flush=True)
+        print("\n") 
\ No newline at end of file
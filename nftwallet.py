@@ -1,11 +1,213 @@
 import requests
+import atexit
+import httpx
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterator, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
+from agentutils import TTLCache, VerboseLog, collect_tool_calls, dumps, enable_verbose_output, loads, unleash_session
 import re
 
+log = logging.getLogger(__name__)
+
+# Response cache capacity; the TTL comes from NFT_CACHE_TTL (seconds, default 300)
+_CACHE_MAX_ENTRIES = 512
+
+# (connect, read) timeout for Unleash NFTs requests, so a hung upstream cannot stall a chat
+_REQUEST_TIMEOUT = (3.05, 10)
+
+# Routes every wallet chat to the same OpenAI prompt cache so the shared system prompt/tools
+# prefix is billed and prefilled at the cached rate; bump the suffix when the prompt changes
+_PROMPT_CACHE_KEY = "nftwallet-sysprompt-v1"
+
+# Rows forwarded to GPT-4o per tool result; prompt tokens drive the final completion's cost and latency
+_TOOL_RESULT_MAX_ROWS = 10
+
+def _project_result(result: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """Keep only what GPT-4o needs from an API result: the top rows and the total count"""
+    if not isinstance(result, dict) or not isinstance(result.get("data"), list):
+        return result
+    
+    projected: Dict[str, Any] = {"data": result["data"][:min(limit, _TOOL_RESULT_MAX_ROWS)]}
+    pagination = result.get("pagination")
+    if isinstance(pagination, dict) and "total" in pagination:
+        projected["pagination"] = {"total": pagination["total"]}
+    return projected
+
+# Shared, immutable agent configuration (built once per process, not per instance/call)
+# Ordered enums: the single source for the tool schemas, the system prompt and validation
+_BLOCKCHAINS = (
+    "avalanche", "base", "binance", "bitcoin", "ethereum", 
+    "linea", "polygon", "root", "solana", "soneium", 
+    "unichain", "unichain_sepolia"
+)
+_SORT_BY = ("volume", "portfolio_value", "transaction_count", "unique_collections")
+_SORT_ORDERS = ("asc", "desc")
+_TIME_RANGES = ("24h", "7d", "30d", "90d", "all")
+
+_SUPPORTED_BLOCKCHAINS = frozenset(_BLOCKCHAINS)
+_SUPPORTED_SORT_BY = frozenset(_SORT_BY)
+_SUPPORTED_SORT_ORDERS = frozenset(_SORT_ORDERS)
+_SUPPORTED_TIME_RANGES = frozenset(_TIME_RANGES)
+
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_analytics",
+            "description": "Get detailed analytics on value and trends for a specific wallet. Use this when users ask for wallet analytics, wallet performance, trading activity, or wallet metrics.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain for the wallet",
+                        "enum": list(_BLOCKCHAINS)
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for analytics",
+                        "enum": list(_TIME_RANGES),
+                        "default": "7d"
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "description": "Sort criteria for results",
+                        "enum": list(_SORT_BY),
+                        "default": "volume"
+                    },
+                    "sort_order": {
+                        "type": "string",
+                        "description": "Sort order (ascending or descending)",
+                        "enum": list(_SORT_ORDERS),
+                        "default": "desc"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["wallet", "blockchain"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_scores",
+            "description": "Get detailed analytics on score values and trends for a specific wallet. Use this when users ask for wallet scores, wallet ratings, portfolio scores, or wallet performance scores.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "blockchain": {
+                        "type": "string",
+                        "description": "Blockchain for the wallet",
+                        "enum": list(_BLOCKCHAINS)
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "description": "Sort criteria for results",
+                        "enum": list(_SORT_BY),
+                        "default": "portfolio_value"
+                    },
+                    "sort_order": {
+                        "type": "string",
+                        "description": "Sort order (ascending or descending)",
+                        "enum": list(_SORT_ORDERS),
+                        "default": "desc"
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for scores",
+                        "enum": list(_TIME_RANGES),
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["wallet", "blockchain"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_profile",
+            "description": "Get comprehensive profiling information for a specific wallet. Use this when users ask for wallet profile, wallet details, NFT holdings, wallet insights, or wallet information.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet": {
+                        "type": "string",
+                        "description": "The wallet address to profile"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["wallet"]
+            }
+        }
+    }
+]
+
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": f"""You are an NFT Wallet Analytics Assistant. You help users get information about wallet analytics, scores, and profiles using three main tools:
+
+1. get_wallet_analytics - Use this when users ask for wallet analytics, wallet performance, trading activity, wallet metrics, or wallet trends. This provides detailed analytics on value and trends.
+
+2. get_wallet_scores - Use this when users ask for wallet scores, wallet ratings, portfolio scores, wallet performance scores, or wallet rankings. This provides detailed analytics on score values and trends.
+
+3. get_wallet_profile - Use this when users ask for wallet profile, wallet details, NFT holdings, wallet insights, wallet information, or comprehensive wallet data. This provides comprehensive profiling information.
+
+IMPORTANT: 
+- If users ask for "analytics", "performance", "trading", "metrics", "trends" → use get_wallet_analytics
+- If users ask for "scores", "ratings", "rankings", "portfolio scores" → use get_wallet_scores
+- If users ask for "profile", "details", "holdings", "insights", "information" → use get_wallet_profile
+
+Supported blockchains: {", ".join(_BLOCKCHAINS)}
+
+Supported time ranges: {", ".join(_TIME_RANGES)}
+Supported sort options: {", ".join(_SORT_BY)}
+Supported sort orders: {", ".join(_SORT_ORDERS)}
+
+When users ask questions, determine which tool(s) to use and call them appropriately. Provide clear, helpful responses based on the data returned."""
+}
+
 class NFTWalletAgent:
     def __init__(self, verbose: bool = True):
         """
@@ -26,153 +228,83 @@ class NFTWalletAgent:
         if not unleash_api_key:
             raise ValueError("UNLEASH_NFTS_API_KEY not found in .env file")
         
-        self.client = OpenAI(api_key=openai_api_key)
+        # HTTP/2 pool to api.openai.com: concurrent chats multiplex over one keep-alive connection
+        self._openai_http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        atexit.register(self._openai_http.close)
+        self.client = OpenAI(api_key=openai_api_key, http_client=self._openai_http)
         self.api_key = unleash_api_key
         self.verbose = verbose
         self.base_url = "https://api.unleashnfts.com/api/v2/nft/wallet"
         
+        # Verbose output goes through logging so disabled messages are never formatted; levels and
+        # handlers are left to the application, and this instance only filters its own debug records
+        self._log = VerboseLog(log, verbose)
+        
+        self.session = unleash_session(self.api_key, pool_connections=10, pool_maxsize=20, retries=3, backoff_factor=0.3)
+        
+        # Responses of the idempotent GET endpoints by (url, params)
+        self._cache = TTLCache(_CACHE_MAX_ENTRIES, self._log)
+        self._cache_ttl = float(os.getenv("NFT_CACHE_TTL", "300"))
+        
+        # Worker pool used to run the tool calls of a single GPT-4o turn concurrently
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nftwallet-tool")
+        
         # Supported blockchains for wallet analytics
-        self.supported_blockchains = [
-            "avalanche", "base", "binance", "bitcoin", "ethereum", 
-            "linea", "polygon", "root", "solana", "soneium", 
-            "unichain", "unichain_sepolia"
-        ]
+        self.supported_blockchains = _SUPPORTED_BLOCKCHAINS
         
         # Supported sort options
-        self.supported_sort_by = ["volume", "portfolio_value", "transaction_count", "unique_collections"]
-        self.supported_sort_order = ["asc", "desc"]
-        self.supported_time_ranges = ["24h", "7d", "30d", "90d", "all"]
+        self.supported_sort_by = _SUPPORTED_SORT_BY
+        self.supported_sort_order = _SUPPORTED_SORT_ORDERS
+        self.supported_time_ranges = _SUPPORTED_TIME_RANGES
         
         # Define the tools for OpenAI function calling
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_analytics",
-                    "description": "Get detailed analytics on value and trends for a specific wallet. Use this when users ask for wallet analytics, wallet performance, trading activity, or wallet metrics.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "wallet": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain for the wallet",
-                                "enum": ["avalanche", "base", "binance", "bitcoin", "ethereum", "linea", "polygon", "root", "solana", "soneium", "unichain", "unichain_sepolia"]
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for analytics",
-                                "enum": ["24h", "7d", "30d", "90d", "all"],
-                                "default": "7d"
-                            },
-                            "sort_by": {
-                                "type": "string",
-                                "description": "Sort criteria for results",
-                                "enum": ["volume", "portfolio_value", "transaction_count", "unique_collections"],
-                                "default": "volume"
-                            },
-                            "sort_order": {
-                                "type": "string",
-                                "description": "Sort order (ascending or descending)",
-                                "enum": ["asc", "desc"],
-                                "default": "desc"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["wallet", "blockchain"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_scores",
-                    "description": "Get detailed analytics on score values and trends for a specific wallet. Use this when users ask for wallet scores, wallet ratings, portfolio scores, or wallet performance scores.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "wallet": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "blockchain": {
-                                "type": "string",
-                                "description": "Blockchain for the wallet",
-                                "enum": ["avalanche", "base", "binance", "bitcoin", "ethereum", "linea", "polygon", "root", "solana", "soneium", "unichain", "unichain_sepolia"]
-                            },
-                            "sort_by": {
-                                "type": "string",
-                                "description": "Sort criteria for results",
-                                "enum": ["portfolio_value", "volume", "transaction_count", "unique_collections"],
-                                "default": "portfolio_value"
-                            },
-                            "sort_order": {
-                                "type": "string",
-                                "description": "Sort order (ascending or descending)",
-                                "enum": ["asc", "desc"],
-                                "default": "desc"
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for scores",
-                                "enum": ["24h", "7d", "30d", "90d", "all"],
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["wallet", "blockchain"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_profile",
-                    "description": "Get comprehensive profiling information for a specific wallet. Use this when users ask for wallet profile, wallet details, NFT holdings, wallet insights, or wallet information.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "wallet": {
-                                "type": "string",
-                                "description": "The wallet address to profile"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["wallet"]
-                    }
-                }
-            }
-        ]
+        self.tools = _TOOLS
+        
+        # Tool name -> bound fetcher, so dispatch is a single dict lookup
+        self._dispatch: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "get_wallet_analytics": self.get_wallet_analytics,
+            "get_wallet_scores": self.get_wallet_scores,
+            "get_wallet_profile": self.get_wallet_profile
+        }
+
+    def _cached_get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET url with params, serving repeats from the TTL cache and sharing in-flight requests"""
+        def fetch() -> Dict[str, Any]:
+            response = self.session.get(url, params=params, timeout=_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            result = loads(response.content)
+            
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("✅ API RESPONSE: Status %s", response.status_code)
+                self._log.debug("📄 RESPONSE SIZE: %s bytes", len(response.content))
+                data = result.get('data') if isinstance(result, dict) else None
+                if data is not None:
+                    self._log.debug("📈 DATA ITEMS: %s items returned", len(data))
+            return result
+        
+        return self._cache.get_or_fetch((url, frozenset(params.items())), self._cache_ttl, fetch, f"GET {url}")
+
+    def _input_error(self, message: str) -> Dict[str, Any]:
+        """Build the error result for a tool call rejected before reaching the API"""
+        error_result = {"error": message}
+        self._log.debug("❌ INPUT ERROR: %s", error_result)
+        return error_result
+
+    def _check_filters(self, blockchain: str, time_range: str, sort_by: str, sort_order: str) -> Optional[Dict[str, Any]]:
+        """Return an error result if any filter is outside the supported values, else None"""
+        if blockchain not in _SUPPORTED_BLOCKCHAINS:
+            return self._input_error(f"Unsupported blockchain: {blockchain}")
+        if time_range not in _SUPPORTED_TIME_RANGES:
+            return self._input_error(f"Unsupported time_range: {time_range}")
+        if sort_by not in _SUPPORTED_SORT_BY:
+            return self._input_error(f"Unsupported sort_by: {sort_by}")
+        if sort_order not in _SUPPORTED_SORT_ORDERS:
+            return self._input_error(f"Unsupported sort_order: {sort_order}")
+        return None
 
     def get_wallet_analytics(
         self, 
@@ -185,16 +317,24 @@ class NFTWalletAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get detailed analytics on value and trends for a specific wallet"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_wallet_analytics")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - wallet: {wallet}")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - time_range: {time_range}")
-            print(f"   - sort_by: {sort_by}")
-            print(f"   - sort_order: {sort_order}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
+        self._log.debug("🔧 TOOL CALL: get_wallet_analytics")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - wallet: %s", wallet)
+        self._log.debug("   - blockchain: %s", blockchain)
+        self._log.debug("   - time_range: %s", time_range)
+        self._log.debug("   - sort_by: %s", sort_by)
+        self._log.debug("   - sort_order: %s", sort_order)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        error_result = self._check_filters(blockchain, time_range, sort_by, sort_order)
+        if error_result is not None:
+            return error_result
+        
+        # EVM addresses are case-insensitive; normalize so equivalent queries share cache entries
+        # (bitcoin/solana addresses are case-sensitive and are left alone)
+        if wallet.startswith("0x"):
+            wallet = wallet.lower()
         
         url = f"{self.base_url}/analytics"
         params = {
@@ -206,31 +346,19 @@ class NFTWalletAgent:
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params)
+        except requests.exceptions.Timeout:
+            error_result = {"error": "upstream timeout"}
+            self._log.debug("❌ API TIMEOUT: %s", url)
+            return error_result
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def get_wallet_scores(
@@ -244,16 +372,24 @@ class NFTWalletAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get detailed analytics on score values and trends for a specific wallet"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_wallet_scores")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - wallet: {wallet}")
-            print(f"   - blockchain: {blockchain}")
-            print(f"   - sort_by: {sort_by}")
-            print(f"   - sort_order: {sort_order}")
-            print(f"   - time_range: {time_range}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
+        self._log.debug("🔧 TOOL CALL: get_wallet_scores")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - wallet: %s", wallet)
+        self._log.debug("   - blockchain: %s", blockchain)
+        self._log.debug("   - sort_by: %s", sort_by)
+        self._log.debug("   - sort_order: %s", sort_order)
+        self._log.debug("   - time_range: %s", time_range)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        error_result = self._check_filters(blockchain, time_range, sort_by, sort_order)
+        if error_result is not None:
+            return error_result
+        
+        # EVM addresses are case-insensitive; normalize so equivalent queries share cache entries
+        # (bitcoin/solana addresses are case-sensitive and are left alone)
+        if wallet.startswith("0x"):
+            wallet = wallet.lower()
         
         url = f"{self.base_url}/scores"
         params = {
@@ -265,31 +401,19 @@ class NFTWalletAgent:
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params)
+        except requests.exceptions.Timeout:
+            error_result = {"error": "upstream timeout"}
+            self._log.debug("❌ API TIMEOUT: %s", url)
+            return error_result
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def get_wallet_profile(
@@ -299,12 +423,16 @@ class NFTWalletAgent:
         limit: int = 30
     ) -> Dict[str, Any]:
         """Get comprehensive profiling information for a specific wallet"""
-        if self.verbose:
-            print(f"🔧 TOOL CALL: get_wallet_profile")
-            print(f"📥 INPUT PARAMETERS:")
-            print(f"   - wallet: {wallet}")
-            print(f"   - offset: {offset}")
-            print(f"   - limit: {limit}")
+        self._log.debug("🔧 TOOL CALL: get_wallet_profile")
+        self._log.debug("📥 INPUT PARAMETERS:")
+        self._log.debug("   - wallet: %s", wallet)
+        self._log.debug("   - offset: %s", offset)
+        self._log.debug("   - limit: %s", limit)
+        
+        # EVM addresses are case-insensitive; normalize so equivalent queries share cache entries
+        # (bitcoin/solana addresses are case-sensitive and are left alone)
+        if wallet.startswith("0x"):
+            wallet = wallet.lower()
         
         url = f"{self.base_url}/profile"
         params = {
@@ -312,50 +440,61 @@ class NFTWalletAgent:
             "offset": offset,
             "limit": limit
         }
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.api_key
-        }
         
-        if self.verbose:
-            print(f"🌐 API REQUEST: GET {url}")
-            print(f"📊 QUERY PARAMS: {params}")
+        self._log.debug("🌐 API REQUEST: GET %s", url)
+        self._log.debug("📊 QUERY PARAMS: %s", params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            result = response.json()
-            
-            if self.verbose:
-                print(f"✅ API RESPONSE: Status {response.status_code}")
-                print(f"📄 RESPONSE SIZE: {len(json.dumps(result))} characters")
-                if isinstance(result, dict) and 'data' in result:
-                    print(f"📈 DATA ITEMS: {len(result.get('data', []))} items returned")
-            
-            return result
-        except requests.exceptions.RequestException as e:
+            return self._cached_get(url, params)
+        except requests.exceptions.Timeout:
+            error_result = {"error": "upstream timeout"}
+            self._log.debug("❌ API TIMEOUT: %s", url)
+            return error_result
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             error_result = {"error": f"API request failed: {str(e)}"}
-            if self.verbose:
-                print(f"❌ API ERROR: {error_result}")
+            self._log.debug("❌ API ERROR: %s", error_result)
             return error_result
 
     def execute_function_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the appropriate function based on the function call"""
-        if self.verbose:
-            print(f"\n🎯 EXECUTING FUNCTION: {function_name}")
-            print(f"🔍 FUNCTION ARGUMENTS: {json.dumps(arguments, indent=2)}")
-        
-        if function_name == "get_wallet_analytics":
-            return self.get_wallet_analytics(**arguments)
-        elif function_name == "get_wallet_scores":
-            return self.get_wallet_scores(**arguments)
-        elif function_name == "get_wallet_profile":
-            return self.get_wallet_profile(**arguments)
-        else:
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("\n🎯 EXECUTING FUNCTION: %s", function_name)
+            self._log.debug("🔍 FUNCTION ARGUMENTS: %s", json.dumps(arguments, indent=2))
+        
+        function = self._dispatch.get(function_name)
+        if function is None:
             error_result = {"error": f"Unknown function: {function_name}"}
-            if self.verbose:
-                print(f"❌ FUNCTION ERROR: {error_result}")
+            self._log.debug("❌ FUNCTION ERROR: %s", error_result)
             return error_result
+        
+        # The API already returns rows in the requested sort order, so the head is the top-N
+        result = function(**arguments)
+        self._log.debug("📦 FULL RESULT: %s", result)
+        # The model may send "limit": null or a non-integer; fall back to the schema default
+        limit = arguments.get("limit")
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0:
+            limit = 30
+        return _project_result(result, limit)
+
+    def _run_tool_call(self, index: int, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single tool call (in chat message form) requested by GPT-4o"""
+        function_name = tool_call["function"]["name"]
+        
+        self._log.debug("\n📞 TOOL CALL #%s:", index)
+        self._log.debug("🔧 Function: %s", function_name)
+        self._log.debug("🆔 Call ID: %s", tool_call['id'])
+        
+        # A failing call becomes an error result so the other concurrent calls still land
+        try:
+            function_args = loads(tool_call["function"]["arguments"])
+            function_result = self.execute_function_call(function_name, function_args)
+        except Exception as e:
+            function_result = {"error": f"Tool execution failed: {str(e)}"}
+            self._log.debug("❌ TOOL #%s FAILED: %s", index, function_result)
+        
+        self._log.debug("✨ TOOL #%s EXECUTION COMPLETED", index)
+        
+        return function_result
 
     def chat(self, user_message: str) -> str:
         """
@@ -367,132 +506,123 @@ class NFTWalletAgent:
         Returns:
             str: Formatted response with the requested data
         """
-        if self.verbose:
-            print(f"\n" + "="*60)
-            print(f"🧠 AGENT THINKING PROCESS")
-            print(f"="*60)
-            print(f"💬 USER QUERY: {user_message}")
-            print(f"🤖 Analyzing query and determining appropriate tools...")
+        return "".join(self.chat_stream(user_message))
+
+    def chat_stream(self, user_message: str) -> Iterator[str]:
+        """
+        Process a natural language query, yielding the response as GPT-4o generates it
+        
+        Args:
+            user_message (str): Natural language query from the user
+            
+        Yields:
+            str: Successive pieces of the formatted response
+        """
+        self._log.debug("\n%s", "=" * 60)
+        self._log.debug("🧠 AGENT THINKING PROCESS")
+        self._log.debug("%s", "=" * 60)
+        self._log.debug("💬 USER QUERY: %s", user_message)
+        self._log.debug("🤖 Analyzing query and determining appropriate tools...")
         
         try:
             # Create the initial conversation with system prompt
             messages = [
-                {
-                    "role": "system",
-                    "content": """You are an NFT Wallet Analytics Assistant. You help users get information about wallet analytics, scores, and profiles using three main tools:
-
-1. get_wallet_analytics - Use this when users ask for wallet analytics, wallet performance, trading activity, wallet metrics, or wallet trends. This provides detailed analytics on value and trends.
-
-2. get_wallet_scores - Use this when users ask for wallet scores, wallet ratings, portfolio scores, wallet performance scores, or wallet rankings. This provides detailed analytics on score values and trends.
-
-3. get_wallet_profile - Use this when users ask for wallet profile, wallet details, NFT holdings, wallet insights, wallet information, or comprehensive wallet data. This provides comprehensive profiling information.
-
-IMPORTANT: 
-- If users ask for "analytics", "performance", "trading", "metrics", "trends" → use get_wallet_analytics
-- If users ask for "scores", "ratings", "rankings", "portfolio scores" → use get_wallet_scores
-- If users ask for "profile", "details", "holdings", "insights", "information" → use get_wallet_profile
-
-Supported blockchains: avalanche, base, binance, bitcoin, ethereum, linea, polygon, root, solana, soneium, unichain, unichain_sepolia
-
-Supported time ranges: 24h, 7d, 30d, 90d, all
-Supported sort options: volume, portfolio_value, transaction_count, unique_collections
-Supported sort orders: asc, desc
-
-When users ask questions, determine which tool(s) to use and call them appropriately. Provide clear, helpful responses based on the data returned."""
-                },
+                _SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": user_message
                 }
             ]
 
-            if self.verbose:
-                print(f"🔄 Making initial request to GPT-4o...")
+            self._log.debug("🔄 Making initial request to GPT-4o...")
 
-            # Make the initial API call to GPT-4o
-            response = self.client.chat.completions.create(
+            # Stream the tool decision so each tool call starts as soon as its arguments are complete
+            stream = self.client.chat.completions.create(
                 model="gpt-4o",
                 messages=messages,
                 tools=self.tools,
-                tool_choice="auto"
+                tool_choice="auto",
+                stream=True,
+                extra_body={"prompt_cache_key": _PROMPT_CACHE_KEY}
+            )
+            
+            pending = []
+            content, tool_calls = collect_tool_calls(
+                stream,
+                lambda tool_call: pending.append(self._executor.submit(self._run_tool_call, len(pending) + 1, tool_call))
             )
 
-            if self.verbose:
-                print(f"📤 GPT-4o RESPONSE RECEIVED")
-                if response.choices[0].message.tool_calls:
-                    print(f"🛠️  GPT-4o wants to call {len(response.choices[0].message.tool_calls)} tool(s)")
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("📤 GPT-4o RESPONSE RECEIVED")
+                if tool_calls:
+                    self._log.debug("🛠️  GPT-4o wants to call %s tool(s)", len(tool_calls))
                 else:
-                    print(f"💭 GPT-4o provided direct response (no tools needed)")
+                    self._log.debug("💭 GPT-4o provided direct response (no tools needed)")
 
             # Check if the model wants to call a function
-            if response.choices[0].message.tool_calls:
+            if tool_calls:
                 # Add the assistant's response to messages
-                messages.append(response.choices[0].message)
+                messages.append({
+                    "role": "assistant",
+                    "content": content or None,
+                    "tool_calls": tool_calls
+                })
                 
-                # Process each tool call
-                for i, tool_call in enumerate(response.choices[0].message.tool_calls):
-                    if self.verbose:
-                        print(f"\n📞 TOOL CALL #{i+1}:")
-                        print(f"🔧 Function: {tool_call.function.name}")
-                        print(f"🆔 Call ID: {tool_call.id}")
-                    
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Execute the function
-                    function_result = self.execute_function_call(function_name, function_args)
-                    
-                    if self.verbose:
-                        print(f"✨ TOOL EXECUTION COMPLETED")
-                        print(f"🔄 Adding result to conversation context...")
-                    
+                # Collect the already-running tool calls in call order
+                for tool_call, future in zip(tool_calls, pending):
                     # Add the function result to messages
                     messages.append({
                         "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(function_result)
+                        "tool_call_id": tool_call["id"],
+                        "content": dumps(future.result())
                     })
 
-                if self.verbose:
-                    print(f"\n🔄 Sending results back to GPT-4o for final response...")
+                self._log.debug("\n🔄 Sending results back to GPT-4o for final response...")
 
-                # Get the final response from GPT-4o
-                final_response = self.client.chat.completions.create(
+                # Stream the final response from GPT-4o so tokens surface as they are generated
+                stream = self.client.chat.completions.create(
                     model="gpt-4o",
-                    messages=messages
+                    messages=messages,
+                    stream=True,
+                    extra_body={"prompt_cache_key": _PROMPT_CACHE_KEY}
                 )
                 
-                final_content = final_response.choices[0].message.content
-                
-                if self.verbose:
-                    print(f"✅ FINAL RESPONSE GENERATED")
-                    print(f"📝 Response length: {len(final_content)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
+                response_length = 0
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        response_length += len(delta)
+                        yield delta
                 
-                return final_content
+                self._log.debug("\n✅ FINAL RESPONSE GENERATED")
+                self._log.debug("📝 Response length: %s characters", response_length)
+                self._log.debug("%s", "=" * 60)
+                self._log.debug("🎯 AGENT FINAL RESPONSE:")
+                self._log.debug("%s", "=" * 60)
             else:
                 # No function call needed, return the direct response
-                direct_response = response.choices[0].message.content
+                direct_response = content
                 
-                if self.verbose:
-                    print(f"✅ DIRECT RESPONSE (no tools needed)")
-                    print(f"📝 Response length: {len(direct_response)} characters")
-                    print(f"="*60)
-                    print(f"🎯 AGENT FINAL RESPONSE:")
-                    print(f"="*60)
+                self._log.debug("✅ DIRECT RESPONSE (no tools needed)")
+                self._log.debug("📝 Response length: %s characters", len(direct_response))
+                self._log.debug("%s", "=" * 60)
+                self._log.debug("🎯 AGENT FINAL RESPONSE:")
+                self._log.debug("%s", "=" * 60)
                 
-                return direct_response
+                yield direct_response
 
         except Exception as e:
             error_msg = f"An error occurred: {str(e)}"
-            if self.verbose:
-                print(f"❌ CRITICAL ERROR: {error_msg}")
-            return error_msg
+            self._log.debug("❌ CRITICAL ERROR: %s", error_msg)
+            yield error_msg
 
 # Example usage
 if __name__ == "__main__":
+    # The REPL is the application here, so it decides where the verbose trace goes
+    enable_verbose_output(log.name)
+    
     # Initialize the agent (API keys will be loaded from .env file)
     try:
         # Set verbose=True to see the agent's thinking process
@@ -519,5 +649,7 @@ if __name__ == "__main__":
         if user_input.lower() in ['quit', 'exit', 'q']:
             break
             
-        response = agent.chat(user_input)
-        print(f"Agent: {response}\n") 
\ No newline at end of file
+        print("Agent: ", end="", flush=True)
+        for token in agent.chat_stream(user_input):
+            print(token, end="", flush=True)
+        print("\n") 
\ No newline at end of file
@@ -1,17 +1,369 @@
 import requests
-import json
+import atexit
+import functools
+import httpx
+import inspect
+import logging
 import os
-from typing import Dict, Any, Optional, List
+import orjson
+import re
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
+from agentutils import (
+    RateLimiter, TTLCache, VerboseLog, chat_batch, collect_tool_calls, dumps, enable_verbose_output, loads,
+    poll_batch, unleash_session
+)
+
+log = logging.getLogger(__name__)
+
+# Upper bound on cached Unleash responses per agent; least recently used entries are evicted first
+_CACHE_MAX_ENTRIES = 1024
+
+# Seconds each tool's response stays fresh: labels barely change, balances and metrics move quickly
+_CACHE_TTLS = {
+    "get_wallet_label": 3600,
+    "get_wallet_score": 300,
+    "get_nft_portfolio": 300,
+    "get_defi_portfolio": 60,
+    "get_erc20_portfolio": 60,
+    "get_wallet_metrics": 30,
+}
+
+# EVM wallet address; anything else that starts with 0x is malformed (non-EVM chains never use the prefix)
+_EVM_ADDRESS_RE = re.compile(r"0x[0-9a-f]{40}")
+
+# Queries asking for fresh data skip cached responses
+_REFRESH_PATTERN = re.compile(r"\b(?:refresh|latest|right now|up[- ]to[- ]date)", re.IGNORECASE)
+
+# (connect, read) timeout for Unleash API requests
+_REQUEST_TIMEOUT = (3.05, 15)
+
+# Banner rule framing each chat turn in the verbose log
+_SEP = "=" * 60
+
+def _columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-shape a tool result's rows into column names plus value lists so keys are not repeated per row"""
+    # Only uniform rows are re-shaped; anything else goes to GPT-4o untouched
+    payload = result.get("data")
+    rows = payload.get("data") if isinstance(payload, dict) else None
+    if not rows or not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return result
+    
+    columns = list(rows[0])
+    column_set = set(columns)
+    if any(row.keys() != column_set for row in rows):
+        return result
+    
+    payload = dict(payload)
+    payload["data"] = {
+        "columns": columns,
+        "rows": [[row[column] for column in columns] for row in rows]
+    }
+    return {**result, "data": payload}
+
+# Tool name -> (Unleash API path, human-readable label, log icon)
+_ENDPOINTS = {
+    "get_defi_portfolio": ("wallet/balance/defi", "DeFi portfolio", "🔄"),
+    "get_nft_portfolio": ("wallet/balance/nft", "NFT portfolio", "🖼️"),
+    "get_erc20_portfolio": ("wallet/balance/token", "ERC20 portfolio", "🪙"),
+    "get_wallet_label": ("wallet/label", "wallet label", "🏷️"),
+    "get_wallet_score": ("wallet/score", "wallet scores", "📊"),
+    "get_wallet_metrics": ("wallet/metrics", "wallet metrics", "📈"),
+}
+
+# Shared, immutable agent configuration (built once per process, not per instance/call)
+_ALL_CHAINS = (
+    "atleta_olympia", "avalanche", "base", "berachain", "binance", "bitcoin", 
+    "ethereum", "linea", "monad_testnet", "polygon", "polyhedra_testnet", "root", 
+    "solana", "somnia_testnet", "soneium", "unichain", "unichain_sepolia"
+)
+_METRICS_CHAINS = ("ethereum", "avalanche", "linea", "polygon")
+
+def _chain_param(chains) -> Dict[str, Any]:
+    """Schema for a `blockchain` tool parameter restricted to `chains`"""
+    return {
+        "type": "string",
+        "description": f"The blockchain to analyze. Options: {', '.join(chains)}",
+        "enum": list(chains)
+    }
+
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_defi_portfolio",
+            "description": "Retrieve a comprehensive overview of a wallet's DeFi portfolio, including key metrics such as token holdings, blockchain details, and asset quantities.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "address": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "blockchain": _chain_param(_ALL_CHAINS),
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["address", "blockchain"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_nft_portfolio",
+            "description": "Retrieve a comprehensive overview of a wallet's NFT holdings, including key metrics such as collection details, contract type, token ID, and quantity owned.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "blockchain": _chain_param(_ALL_CHAINS),
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["wallet", "blockchain"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_erc20_portfolio",
+            "description": "Retrieve a comprehensive overview of a wallet's ERC-20 token holdings, including key metrics such as token details, quantity owned, and blockchain information.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "address": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "blockchain": _chain_param(_ALL_CHAINS),
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["address", "blockchain"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_label",
+            "description": "Retrieve a comprehensive overview of a wallet's classification and associated risk factors, including key metrics such as activity type, security status, and protocol involvement.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "address": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["address"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_score",
+            "description": "Retrieve a comprehensive overview of a wallet's activity and risk assessment, including key metrics such as interaction patterns, classification, and risk scores.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_metrics",
+            "description": "Retrieve a comprehensive overview of a wallet's transactional activity, including key metrics such as transaction volume, inflow/outflow data, and wallet age.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "blockchain": _chain_param(_METRICS_CHAINS),
+                    "wallet": {
+                        "type": "string",
+                        "description": "The wallet address to analyze"
+                    },
+                    "time_range": {
+                        "type": "string",
+                        "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
+                        "default": "all"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Offset for pagination",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Limit for number of results",
+                        "default": 30
+                    }
+                },
+                "required": ["blockchain", "wallet"]
+            }
+        }
+    }
+]
+
+# Keywords that mark a query as needing a tool; queries matching none get every tool
+_TOOL_KEYWORDS = {
+    "get_defi_portfolio": ("defi",),
+    "get_nft_portfolio": ("nft", "collection"),
+    "get_erc20_portfolio": ("erc20", "erc-20", "token", "fungible"),
+    "get_wallet_label": ("label", "classification", "risk factor", "activity type"),
+    "get_wallet_score": ("score", "risk assessment", "interaction"),
+    "get_wallet_metrics": ("metric", "transaction", "volume", "inflow", "outflow"),
+}
+
+# Broad requests ("complete portfolio", "everything about") always get the full tool set
+_ALL_TOOLS_KEYWORDS = ("comprehensive", "complete", "everything", "full")
+
+def _keyword_pattern(keywords) -> "re.Pattern[str]":
+    """One case-insensitive alternation per keyword group, anchored at word starts so plurals still match"""
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + ")", re.IGNORECASE)
+
+# Compiled once so tool selection is a single regex scan per tool instead of a substring loop
+_TOOL_PATTERNS = {name: _keyword_pattern(keywords) for name, keywords in _TOOL_KEYWORDS.items()}
+_ALL_TOOLS_PATTERN = _keyword_pattern(_ALL_TOOLS_KEYWORDS)
+
+@functools.lru_cache(maxsize=None)
+def _tool_subset(names: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Shared, never-mutated schema list for one tool combination (at most 2**6 of them)"""
+    return [tool for tool in _TOOLS if tool["function"]["name"] in names]
+
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": f"""You are a Portfolio Analysis Agent that specializes in comprehensive wallet analysis. You have access to multiple tools to analyze different aspects of wallets and portfolios:
+
+**Available Tools:**
+1. **DeFi Portfolio** - Analyze a wallet's DeFi holdings, token balances, and blockchain details
+2. **NFT Portfolio** - Analyze a wallet's NFT holdings, collection details, and token IDs
+3. **ERC20 Portfolio** - Analyze ERC-20 token holdings and blockchain information
+4. **Wallet Label** - Get wallet classification, risk factors, and activity type
+5. **Wallet Score** - Get wallet activity assessment, interaction patterns, and risk scores
+6. **Wallet Metrics** - Get transactional activity, volume, inflow/outflow data, and wallet age
+
+**Tool Selection Guidelines:**
+- If the query mentions "DeFi", "defi portfolio", "DeFi holdings" → use get_defi_portfolio
+- If the query mentions "NFT", "NFT holdings", "NFT portfolio", "collections" → use get_nft_portfolio
+- If the query mentions "ERC20", "tokens", "token holdings", "fungible tokens" → use get_erc20_portfolio
+- If the query mentions "wallet label", "classification", "risk factors", "activity type" → use get_wallet_label
+- If the query mentions "wallet score", "risk assessment", "interaction patterns" → use get_wallet_score
+- If the query mentions "wallet metrics", "transactional activity", "volume", "inflow/outflow" → use get_wallet_metrics
+- If the query mentions "portfolio", "comprehensive analysis", "wallet analysis" → use multiple tools as appropriate
+
+**Required Parameters:**
+- For DeFi Portfolio: address, blockchain (required)
+- For NFT Portfolio: wallet, blockchain (required)
+- For ERC20 Portfolio: address, blockchain (required)
+- For Wallet Label: address (required)
+- For Wallet Score: no required parameters
+- For Wallet Metrics: blockchain, wallet (required)
+
+**Blockchain Options:**
+- DeFi/NFT/ERC20: {", ".join(_ALL_CHAINS)}
+- Wallet Metrics: {", ".join(_METRICS_CHAINS)}
+
+**Time Range Options:** 1d, 7d, 30d, 90d, 1y, all (default: all)
+
+Always extract wallet addresses and blockchain information from the user query. If no blockchain is specified, default to 'ethereum'."""
+}
 
 class PortfolioAgent:
-    def __init__(self, verbose: bool = True):
+    def __init__(
+        self,
+        verbose: bool = True,
+        cache_ttl: Optional[int] = None,
+        max_concurrency: int = 10,
+        rate_limit_per_minute: int = 300,
+        prefetch: bool = False
+    ):
         """
         Initialize the Portfolio Analysis Agent
         
         Args:
             verbose (bool): Enable verbose logging to see agent's thinking process
+            cache_ttl (int, optional): Seconds an Unleash API response is reused for identical
+                requests; overrides the per-tool defaults when given
+            max_concurrency (int): Most Unleash API requests in flight at once
+            rate_limit_per_minute (int): Unleash API request budget per minute
+            prefetch (bool): After each turn, warm the cache with the other tools for the same wallet
         """
         # Load environment variables from .env file
         load_dotenv()
@@ -23,689 +375,444 @@ class PortfolioAgent:
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY not found in .env file")
         
-        self.client = OpenAI(api_key=openai_api_key)
+        # Shared HTTP/2 pool so concurrent turns multiplex over warm connections to api.openai.com
+        self._openai_http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        atexit.register(self._openai_http.close)
+        self.client = OpenAI(api_key=openai_api_key, http_client=self._openai_http)
         self.unleash_api_key = unleash_api_key
         self.verbose = verbose
         
-        # Define the tools for OpenAI function calling
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_defi_portfolio",
-                    "description": "Retrieve a comprehensive overview of a wallet's DeFi portfolio, including key metrics such as token holdings, blockchain details, and asset quantities.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "blockchain": {
-                                "type": "string",
-                                "description": "The blockchain to analyze. Options: atleta_olympia, avalanche, base, berachain, binance, bitcoin, ethereum, linea, monad_testnet, polygon, polyhedra_testnet, root, solana, somnia_testnet, soneium, unichain, unichain_sepolia",
-                                "enum": ["atleta_olympia", "avalanche", "base", "berachain", "binance", "bitcoin", "ethereum", "linea", "monad_testnet", "polygon", "polyhedra_testnet", "root", "solana", "somnia_testnet", "soneium", "unichain", "unichain_sepolia"]
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["address", "blockchain"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_nft_portfolio",
-                    "description": "Retrieve a comprehensive overview of a wallet's NFT holdings, including key metrics such as collection details, contract type, token ID, and quantity owned.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "wallet": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "blockchain": {
-                                "type": "string",
-                                "description": "The blockchain to analyze. Options: atleta_olympia, avalanche, base, berachain, binance, bitcoin, ethereum, linea, monad_testnet, polygon, polyhedra_testnet, root, solana, somnia_testnet, soneium, unichain, unichain_sepolia",
-                                "enum": ["atleta_olympia", "avalanche", "base", "berachain", "binance", "bitcoin", "ethereum", "linea", "monad_testnet", "polygon", "polyhedra_testnet", "root", "solana", "somnia_testnet", "soneium", "unichain", "unichain_sepolia"]
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["wallet", "blockchain"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_erc20_portfolio",
-                    "description": "Retrieve a comprehensive overview of a wallet's ERC-20 token holdings, including key metrics such as token details, quantity owned, and blockchain information.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "blockchain": {
-                                "type": "string",
-                                "description": "The blockchain to analyze. Options: atleta_olympia, avalanche, base, berachain, binance, bitcoin, ethereum, linea, monad_testnet, polygon, polyhedra_testnet, root, solana, somnia_testnet, soneium, unichain, unichain_sepolia",
-                                "enum": ["atleta_olympia", "avalanche", "base", "berachain", "binance", "bitcoin", "ethereum", "linea", "monad_testnet", "polygon", "polyhedra_testnet", "root", "solana", "somnia_testnet", "soneium", "unichain", "unichain_sepolia"]
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["address", "blockchain"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_label",
-                    "description": "Retrieve a comprehensive overview of a wallet's classification and associated risk factors, including key metrics such as activity type, security status, and protocol involvement.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "address": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["address"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_score",
-                    "description": "Retrieve a comprehensive overview of a wallet's activity and risk assessment, including key metrics such as interaction patterns, classification, and risk scores.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": []
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_wallet_metrics",
-                    "description": "Retrieve a comprehensive overview of a wallet's transactional activity, including key metrics such as transaction volume, inflow/outflow data, and wallet age.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "blockchain": {
-                                "type": "string",
-                                "description": "The blockchain to analyze. Options: ethereum, avalanche, linea, polygon",
-                                "enum": ["ethereum", "avalanche", "linea", "polygon"]
-                            },
-                            "wallet": {
-                                "type": "string",
-                                "description": "The wallet address to analyze"
-                            },
-                            "time_range": {
-                                "type": "string",
-                                "description": "Time range for the analysis. Options: 1d, 7d, 30d, 90d, 1y, all",
-                                "default": "all"
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset for pagination",
-                                "default": 0
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Limit for number of results",
-                                "default": 30
-                            }
-                        },
-                        "required": ["blockchain", "wallet"]
-                    }
-                }
-            }
-        ]
-
-    def get_defi_portfolio(self, address: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
-        """Get DeFi portfolio for a wallet address"""
-        if self.verbose:
-            print(f"🔄 Getting DeFi portfolio for {address} on {blockchain}")
+        # Verbose output goes through logging so disabled messages are never formatted; levels and
+        # handlers are left to the application, and this instance only filters its own debug records
+        self._log = VerboseLog(log, verbose)
         
-        url = f"https://api.unleashnfts.com/api/v2/wallet/balance/defi"
+        self.base_url = "https://api.unleashnfts.com/api/v2"
         
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
+        self.session = unleash_session(self.unleash_api_key, pool_connections=8, pool_maxsize=32, retries=3, backoff_factor=0.5)
         
-        params = {
-            "address": address,
-            "blockchain": blockchain,
-            "time_range": time_range,
-            "offset": offset,
-            "limit": limit
-        }
+        # Bound parallel fan-out so a large tool wave or batch cannot trip the API's rate limits
+        self._request_slots = threading.BoundedSemaphore(max_concurrency)
+        self._rate_limiter = RateLimiter(rate_limit_per_minute, 60.0)
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ DeFi portfolio retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
-            
-            return {
-                "success": True,
-                "data": data,
-                "summary": f"Retrieved DeFi portfolio for {address} on {blockchain} with {len(data.get('data', []))} data points"
-            }
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get DeFi portfolio: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
-            return {
-                "success": False,
-                "error": error_msg
-            }
-
-    def get_nft_portfolio(self, wallet: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
-        """Get NFT portfolio for a wallet address"""
-        if self.verbose:
-            print(f"🖼️ Getting NFT portfolio for {wallet} on {blockchain}")
+        # TTL cache for Unleash responses, shared by all tool calls (and their worker threads)
+        self._cache = TTLCache(_CACHE_MAX_ENTRIES, self._log)
+        self._cache_ttl = cache_ttl
         
-        url = f"https://api.unleashnfts.com/api/v2/wallet/balance/nft"
+        # Worker pool used to run the tool calls of a single GPT-4o turn concurrently
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="portfolio-tool")
         
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
+        # Small separate pool for speculative follow-up fetches so they never delay real tool calls
+        self.prefetch = prefetch
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="portfolio-prefetch")
+        self._prefetches: List[Future] = []
         
-        params = {
-            "wallet": wallet,
-            "blockchain": blockchain,
-            "time_range": time_range,
-            "offset": offset,
-            "limit": limit
-        }
+        # Tool schemas are module-level and shared by every agent instance
+        self.tools = _TOOLS
         
+        # Tool name -> bound fetcher, so dispatch is a single dict lookup
+        self._dispatch: Dict[str, Callable[..., Dict[str, Any]]] = {
+            name: getattr(self, name) for name in _ENDPOINTS
+        }
+        self._signatures = {name: inspect.signature(handler) for name, handler in self._dispatch.items()}
+
+    def warmup(self) -> None:
+        """Resolve the Unleash API host and open a pooled connection so the first tool call skips DNS and TLS setup"""
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ NFT portfolio retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
-            
-            return {
-                "success": True,
-                "data": data,
-                "summary": f"Retrieved NFT portfolio for {wallet} on {blockchain} with {len(data.get('data', []))} data points"
-            }
-            
+            self.session.head(self.base_url, timeout=5.0)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get NFT portfolio: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
-            return {
-                "success": False,
-                "error": error_msg
-            }
+            self._log.debug("⚠️ Warmup request failed: %s", e)
 
-    def get_erc20_portfolio(self, address: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
-        """Get ERC20 portfolio for a wallet address"""
-        if self.verbose:
-            print(f"🪙 Getting ERC20 portfolio for {address} on {blockchain}")
+    def _get(self, endpoint: str, params: Dict[str, Any], ttl: float, bypass_cache: bool = False) -> Any:
+        """GET an Unleash API endpoint, serving repeats of the same request from the TTL cache unless bypass_cache is set"""
+        def fetch() -> Any:
+            self._rate_limiter.acquire()
+            with self._request_slots:
+                response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return loads(response.content)
         
-        url = f"https://api.unleashnfts.com/api/v2/wallet/balance/token"
+        return self._cache.get_or_fetch((endpoint, tuple(sorted(params.items()))), ttl, fetch, endpoint, bypass=bypass_cache)
+
+    def clear_cache(self) -> None:
+        """Drop every cached Unleash response so the next tool calls hit the API"""
+        self._cache.clear()
+        self._log.debug("🧹 CACHE CLEARED")
+
+    def _fetch(self, name: str, *, bypass_cache: bool = False, **params: Any) -> Dict[str, Any]:
+        """Call the Unleash endpoint behind tool `name` and wrap the response in the standard result dict"""
+        path, label, icon = _ENDPOINTS[name]
+        
+        # EVM addresses are case-insensitive, so differently-cased repeats share a cache entry;
+        # malformed ones are rejected here instead of costing an API round trip
+        for field in ("address", "wallet"):
+            value = params.get(field)
+            if isinstance(value, str) and value[:2].lower() == "0x":
+                params[field] = value = value.lower()
+                if not _EVM_ADDRESS_RE.fullmatch(value):
+                    error_msg = f"Invalid {field}: {value} (expected 0x followed by 40 hex digits)"
+                    self._log.debug("❌ %s", error_msg)
+                    return {
+                        "success": False,
+                        "error": error_msg
+                    }
         
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
+        who = params.get("address") or params.get("wallet")
+        target = (f" for {who}" if who else "") + (f" on {params['blockchain']}" if "blockchain" in params else "")
         
-        params = {
-            "address": address,
-            "blockchain": blockchain,
-            "time_range": time_range,
-            "offset": offset,
-            "limit": limit
-        }
+        self._log.debug("%s Getting %s%s", icon, label, target)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
+            ttl = self._cache_ttl if self._cache_ttl is not None else _CACHE_TTLS[name]
+            data = self._get(path, params, ttl, bypass_cache)
             
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ ERC20 portfolio retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("✅ %s%s retrieved successfully", label[0].upper(), label[1:])
+                self._log.debug("📊 Data points: %s", len(data.get('data', [])))
+                self._log.debug("📄 API Response: %s", orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
             
             return {
                 "success": True,
                 "data": data,
-                "summary": f"Retrieved ERC20 portfolio for {address} on {blockchain} with {len(data.get('data', []))} data points"
+                "summary": f"Retrieved {label}{target} with {len(data.get('data', []))} data points"
             }
             
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get ERC20 portfolio: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            error_msg = f"Failed to get {label}: {str(e)}"
+            self._log.debug("❌ %s", error_msg)
             return {
                 "success": False,
                 "error": error_msg
             }
 
+    def get_defi_portfolio(self, address: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
+        """Get DeFi portfolio for a wallet address"""
+        return self._fetch("get_defi_portfolio", address=address, blockchain=blockchain, time_range=time_range, offset=offset, limit=limit)
+
+    def get_nft_portfolio(self, wallet: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
+        """Get NFT portfolio for a wallet address"""
+        return self._fetch("get_nft_portfolio", wallet=wallet, blockchain=blockchain, time_range=time_range, offset=offset, limit=limit)
+
+    def get_erc20_portfolio(self, address: str, blockchain: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
+        """Get ERC20 portfolio for a wallet address"""
+        return self._fetch("get_erc20_portfolio", address=address, blockchain=blockchain, time_range=time_range, offset=offset, limit=limit)
+
     def get_wallet_label(self, address: str, offset: int = 0, limit: int = 30) -> Dict[str, Any]:
         """Get wallet label and classification"""
-        if self.verbose:
-            print(f"🏷️ Getting wallet label for {address}")
-        
-        url = f"https://api.unleashnfts.com/api/v2/wallet/label"
-        
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
-        
-        params = {
-            "address": address,
-            "offset": offset,
-            "limit": limit
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ Wallet label retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
-            
-            return {
-                "success": True,
-                "data": data,
-                "summary": f"Retrieved wallet label for {address} with {len(data.get('data', []))} data points"
-            }
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get wallet label: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
-            return {
-                "success": False,
-                "error": error_msg
-            }
+        return self._fetch("get_wallet_label", address=address, offset=offset, limit=limit)
 
     def get_wallet_score(self, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
         """Get wallet score and risk assessment"""
-        if self.verbose:
-            print(f"📊 Getting wallet scores")
-        
-        url = f"https://api.unleashnfts.com/api/v2/wallet/score"
-        
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
-        
-        params = {
-            "time_range": time_range,
-            "offset": offset,
-            "limit": limit
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ Wallet scores retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
-            
-            return {
-                "success": True,
-                "data": data,
-                "summary": f"Retrieved wallet scores with {len(data.get('data', []))} data points"
-            }
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get wallet scores: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
-            return {
-                "success": False,
-                "error": error_msg
-            }
+        return self._fetch("get_wallet_score", time_range=time_range, offset=offset, limit=limit)
 
     def get_wallet_metrics(self, blockchain: str, wallet: str, time_range: str = "all", offset: int = 0, limit: int = 30) -> Dict[str, Any]:
         """Get wallet metrics and transactional activity"""
-        if self.verbose:
-            print(f"📈 Getting wallet metrics for {wallet} on {blockchain}")
+        return self._fetch("get_wallet_metrics", blockchain=blockchain, wallet=wallet, time_range=time_range, offset=offset, limit=limit)
+
+    def execute_tool_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the appropriate tool function"""
+        return self._execute_tool_call(function_name, arguments)
+
+    def _execute_tool_call(self, function_name: str, arguments: Dict[str, Any], bypass_cache: bool = False) -> Dict[str, Any]:
+        """Execute a tool call, optionally skipping cached responses when the user asked for fresh data"""
+        self._log.debug("\n🔧 EXECUTING TOOL: %s", function_name)
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("📋 ARGUMENTS: %s", orjson.dumps(arguments, option=orjson.OPT_INDENT_2).decode())
+        
+        handler = self._dispatch.get(function_name)
+        if handler is None:
+            error_result = {"error": f"Unknown function: {function_name}"}
+            self._log.debug("❌ UNKNOWN FUNCTION: %s", function_name)
+            return error_result
         
-        url = f"https://api.unleashnfts.com/api/v2/wallet/metrics"
+        # Cache control is decided from the user's wording, never taken from the model's arguments
+        if "bypass_cache" in arguments:
+            arguments = {key: value for key, value in arguments.items() if key != "bypass_cache"}
+
+        if not bypass_cache:
+            return handler(**arguments)
+        
+        # Bind against the public tool signature so defaults and argument checks stay identical,
+        # then go straight to the private fetch path that knows about the cache flag
+        bound = self._signatures[function_name].bind(**arguments)
+        bound.apply_defaults()
+        return self._fetch(function_name, bypass_cache=True, **bound.arguments)
+
+    def _select_tools(self, user_message: str) -> List[Dict[str, Any]]:
+        """Pick the tool schemas a query plausibly needs, so GPT-4o is not sent all six every time"""
+        if _ALL_TOOLS_PATTERN.search(user_message):
+            return _TOOLS
         
-        headers = {
-            "accept": "application/json",
-            "x-api-key": self.unleash_api_key
-        }
+        names = tuple(name for name, pattern in _TOOL_PATTERNS.items() if pattern.search(user_message))
+        return _tool_subset(names) if names else _TOOLS
+
+    def _run_tool_call(self, index: int, tool_call: Dict[str, Any], bypass_cache: bool = False) -> Dict[str, Any]:
+        """Execute a single tool call (in chat message form) requested by GPT-4o"""
+        function_name = tool_call["function"]["name"]
         
-        params = {
-            "blockchain": blockchain,
-            "wallet": wallet,
-            "time_range": time_range,
-            "offset": offset,
-            "limit": limit
-        }
+        self._log.debug("\n📞 TOOL CALL #%s:", index)
+        self._log.debug("🔧 Function: %s", function_name)
+        self._log.debug("🆔 Call ID: %s", tool_call['id'])
         
+        # A failing call becomes an error result so the other concurrent calls still land
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if self.verbose:
-                print(f"✅ Wallet metrics retrieved successfully")
-                print(f"📊 Data points: {len(data.get('data', []))}")
-                print(f"📄 API Response: {json.dumps(data, indent=2)}")
-            
-            return {
-                "success": True,
-                "data": data,
-                "summary": f"Retrieved wallet metrics for {wallet} on {blockchain} with {len(data.get('data', []))} data points"
-            }
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to get wallet metrics: {str(e)}"
-            if self.verbose:
-                print(f"❌ {error_msg}")
-            return {
+            function_args = loads(tool_call["function"]["arguments"])
+            tool_result = self._execute_tool_call(function_name, function_args, bypass_cache)
+        except Exception as e:
+            tool_result = {
                 "success": False,
-                "error": error_msg
+                "error": f"Tool execution failed: {str(e)}"
             }
+            self._log.debug("❌ TOOL #%s FAILED: %s", index, tool_result['error'])
+        
+        self._log.debug("✅ TOOL #%s COMPLETED", index)
+        
+        return tool_result
 
-    def execute_tool_call(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the appropriate tool function"""
-        if self.verbose:
-            print(f"\n🔧 EXECUTING TOOL: {function_name}")
-            print(f"📋 ARGUMENTS: {json.dumps(arguments, indent=2)}")
-        
-        if function_name == "get_defi_portfolio":
-            return self.get_defi_portfolio(**arguments)
-        elif function_name == "get_nft_portfolio":
-            return self.get_nft_portfolio(**arguments)
-        elif function_name == "get_erc20_portfolio":
-            return self.get_erc20_portfolio(**arguments)
-        elif function_name == "get_wallet_label":
-            return self.get_wallet_label(**arguments)
-        elif function_name == "get_wallet_score":
-            return self.get_wallet_score(**arguments)
-        elif function_name == "get_wallet_metrics":
-            return self.get_wallet_metrics(**arguments)
-        else:
-            error_result = {"error": f"Unknown function: {function_name}"}
-            if self.verbose:
-                print(f"❌ UNKNOWN FUNCTION: {function_name}")
-            return error_result
+    def _prefetch_follow_ups(self, tool_calls: List[Dict[str, Any]]) -> None:
+        """Warm the cache with the remaining per-wallet tools for the wallet and chain just queried"""
+        called = set()
+        wallet = blockchain = None
+        for tool_call in tool_calls:
+            called.add(tool_call["function"]["name"])
+            try:
+                arguments = loads(tool_call["function"]["arguments"])
+            except orjson.JSONDecodeError:
+                continue
+            if wallet is None and isinstance(arguments, dict):
+                wallet = arguments.get("address") or arguments.get("wallet")
+                blockchain = arguments.get("blockchain")
+        if not wallet:
+            return
+        
+        follow_ups = {"get_wallet_label": {"address": wallet}}
+        if blockchain in _ALL_CHAINS:
+            follow_ups["get_defi_portfolio"] = {"address": wallet, "blockchain": blockchain}
+            follow_ups["get_nft_portfolio"] = {"wallet": wallet, "blockchain": blockchain}
+            follow_ups["get_erc20_portfolio"] = {"address": wallet, "blockchain": blockchain}
+        if blockchain in _METRICS_CHAINS:
+            follow_ups["get_wallet_metrics"] = {"blockchain": blockchain, "wallet": wallet}
+        
+        for name, arguments in follow_ups.items():
+            if name not in called:
+                self._log.debug("🔮 PREFETCH: %s %s", name, arguments)
+                self._prefetches.append(self._prefetch_executor.submit(self._dispatch[name], **arguments))
 
-    def chat(self, user_message: str) -> str:
+    def _log_final(self, content: str, header: str) -> None:
+        """Log the closing banner of a chat turn"""
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug("✅ %s", header)
+            self._log.debug("📝 Response length: %s characters", len(content))
+            self._log.debug(_SEP)
+            self._log.debug("💼 PORTFOLIO AGENT FINAL RESPONSE:")
+            self._log.debug(_SEP)
+
+    def chat(self, user_message: str, on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Process a natural language query and execute appropriate portfolio analysis tools
         
         Args:
             user_message (str): Natural language query from the user
+            on_token (callable, optional): Called with each piece of the response as it is generated
             
         Returns:
             str: Formatted response with the requested portfolio data
         """
-        if self.verbose:
-            print(f"\n" + "="*60)
-            print(f"💼 PORTFOLIO AGENT THINKING PROCESS")
-            print(f"="*60)
-            print(f"💬 USER QUERY: {user_message}")
-            print(f"🤖 Analyzing query and determining which portfolio tools to use...")
+        self._log.debug("\n%s", _SEP)
+        self._log.debug("💼 PORTFOLIO AGENT THINKING PROCESS")
+        self._log.debug(_SEP)
+        self._log.debug("💬 USER QUERY: %s", user_message)
+        self._log.debug("🤖 Analyzing query and determining which portfolio tools to use...")
+        
+        # Prefetches still queued from the previous turn are guesses this query may not need
+        for future in self._prefetches:
+            future.cancel()
+        self._prefetches = []
+        
+        # "Refresh"/"latest" queries skip cached reads for this turn only; fresh results are still cached
+        bypass_cache = bool(_REFRESH_PATTERN.search(user_message))
         
         try:
             # Create the initial conversation with system prompt
             messages = [
-                {
-                    "role": "system",
-                    "content": """You are a Portfolio Analysis Agent that specializes in comprehensive wallet analysis. You have access to multiple tools to analyze different aspects of wallets and portfolios:
-
-**Available Tools:**
-1. **DeFi Portfolio** - Analyze a wallet's DeFi holdings, token balances, and blockchain details
-2. **NFT Portfolio** - Analyze a wallet's NFT holdings, collection details, and token IDs
-3. **ERC20 Portfolio** - Analyze ERC-20 token holdings and blockchain information
-4. **Wallet Label** - Get wallet classification, risk factors, and activity type
-5. **Wallet Score** - Get wallet activity assessment, interaction patterns, and risk scores
-6. **Wallet Metrics** - Get transactional activity, volume, inflow/outflow data, and wallet age
-
-**Tool Selection Guidelines:**
-- If the query mentions "DeFi", "defi portfolio", "DeFi holdings" → use get_defi_portfolio
-- If the query mentions "NFT", "NFT holdings", "NFT portfolio", "collections" → use get_nft_portfolio
-- If the query mentions "ERC20", "tokens", "token holdings", "fungible tokens" → use get_erc20_portfolio
-- If the query mentions "wallet label", "classification", "risk factors", "activity type" → use get_wallet_label
-- If the query mentions "wallet score", "risk assessment", "interaction patterns" → use get_wallet_score
-- If the query mentions "wallet metrics", "transactional activity", "volume", "inflow/outflow" → use get_wallet_metrics
-- If the query mentions "portfolio", "comprehensive analysis", "wallet analysis" → use multiple tools as appropriate
-
-**Required Parameters:**
-- For DeFi Portfolio: address, blockchain (required)
-- For NFT Portfolio: wallet, blockchain (required)
-- For ERC20 Portfolio: address, blockchain (required)
-- For Wallet Label: address (required)
-- For Wallet Score: no required parameters
-- For Wallet Metrics: blockchain, wallet (required)
-
-**Blockchain Options:**
-- DeFi/NFT/ERC20: atleta_olympia, avalanche, base, berachain, binance, bitcoin, ethereum, linea, monad_testnet, polygon, polyhedra_testnet, root, solana, somnia_testnet, soneium, unichain, unichain_sepolia
-- Wallet Metrics: ethereum, avalanche, linea, polygon
-
-**Time Range Options:** 1d, 7d, 30d, 90d, 1y, all (default: all)
-
-Always extract wallet addresses and blockchain information from the user query. If no blockchain is specified, default to 'ethereum'."""
-                },
+                _SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": user_message
                 }
             ]
 
-            if self.verbose:
-                print(f"🔄 Making tool selection decision with GPT-4o...")
+            self._log.debug("🔄 Making tool selection decision with GPT-4o...")
 
-            # Make the initial API call to GPT-4o for tool selection
-            response = self.client.chat.completions.create(
+            # Stream the tool selection so each tool call starts as soon as its arguments are complete
+            stream = self.client.chat.completions.create(
                 model="gpt-4o",
                 messages=messages,
-                tools=self.tools,
-                tool_choice="auto"
+                tools=self._select_tools(user_message),
+                tool_choice="auto",
+                # Independent tools come back in one wave and run concurrently on the worker pool
+                parallel_tool_calls=True,
+                stream=True
+            )
+            
+            # Direct answers surface token by token instead of after the whole selection stream
+            pending = []
+            content, tool_calls = collect_tool_calls(
+                stream,
+                lambda tool_call: pending.append(
+                    self._executor.submit(self._run_tool_call, len(pending) + 1, tool_call, bypass_cache)
+                ),
+                on_token
             )
 
-            if self.verbose:
-                print(f"📤 GPT-4o TOOL SELECTION RESPONSE RECEIVED")
-                if response.choices[0].message.tool_calls:
-                    print(f"🛠️  GPT-4o wants to call {len(response.choices[0].message.tool_calls)} tool(s)")
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug("📤 GPT-4o TOOL SELECTION RESPONSE RECEIVED")
+                if tool_calls:
+                    self._log.debug("🛠️  GPT-4o wants to call %s tool(s)", len(tool_calls))
                 else:
-                    print(f"💭 GPT-4o provided direct response (no tools needed)")
+                    self._log.debug("💭 GPT-4o provided direct response (no tools needed)")
 
             # Check if the model wants to call tools
-            if response.choices[0].message.tool_calls:
+            if tool_calls:
                 # Add the assistant's response to messages
-                messages.append(response.choices[0].message)
+                messages.append({
+                    "role": "assistant",
+                    "content": content or None,
+                    "tool_calls": tool_calls
+                })
+                
+                # Collect the already-running tool calls in call order
+                tool_results = [future.result() for future in pending]
                 
-                # Process each tool call SEQUENTIALLY
-                tool_results = []
-                for i, tool_call in enumerate(response.choices[0].message.tool_calls):
-                    if self.verbose:
-                        print(f"\n📞 TOOL CALL #{i+1}:")
-                        print(f"🔧 Function: {tool_call.function.name}")
-                        print(f"🆔 Call ID: {tool_call.id}")
-                    
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    if self.verbose:
-                        print(f"⏳ EXECUTING TOOL #{i+1} - WAITING FOR COMPLETION...")
-                    
-                    # Execute the tool and WAIT for completion
-                    tool_result = self.execute_tool_call(function_name, function_args)
-                    tool_results.append(tool_result)
-                    
-                    if self.verbose:
-                        print(f"✅ TOOL #{i+1} COMPLETED")
-                        print(f"🔄 Adding result to conversation context...")
-                    
+                if self.prefetch:
+                    self._prefetch_follow_ups(tool_calls)
+                
+                for tool_call, tool_result in zip(tool_calls, tool_results):
                     # Add the tool result to messages
                     messages.append({
                         "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(tool_result)
+                        "tool_call_id": tool_call["id"],
+                        "content": dumps(_columnar(tool_result))
                     })
-                    
-                    # Wait a moment before processing next tool call (if any)
-                    if i < len(response.choices[0].message.tool_calls) - 1:
-                        if self.verbose:
-                            print(f"⏳ MOVING TO NEXT TOOL CALL...")
 
-                if self.verbose:
-                    print(f"\n🔄 Sending results back to GPT-4o for final formatting...")
+                self._log.debug("\n🔄 Sending results back to GPT-4o for final formatting...")
 
-                # Get the final response from GPT-4o for formatting
-                final_response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=messages
-                )
-                
-                final_content = final_response.choices[0].message.content
-                
-                if self.verbose:
-                    print(f"\n💼 PORTFOLIO AGENT FINAL SUMMARY:")
-                    print(f"📊 Tool Results: {len(tool_results)} tool(s) executed")
+                if self._log.isEnabledFor(logging.DEBUG):
+                    self._log.debug("\n💼 PORTFOLIO AGENT FINAL SUMMARY:")
+                    self._log.debug("📊 Tool Results: %s tool(s) executed", len(tool_results))
                     for i, result in enumerate(tool_results):
                         success = result.get("success", False)
                         summary = result.get("summary", "No summary available")
-                        print(f"   {i+1}. {'✅' if success else '❌'} {summary}")
+                        self._log.debug("   %s. %s %s", i+1, '✅' if success else '❌', summary)
+
+                # Stream the final response from GPT-4o so tokens surface as they are generated
+                stream = self.client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=messages,
+                    stream=True
+                )
+                
+                parts = []
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        if on_token is not None:
+                            on_token(delta)
+                final_content = "".join(parts)
                 
-                if self.verbose:
-                    print(f"✅ FINAL RESPONSE GENERATED")
-                    print(f"📝 Response length: {len(final_content)} characters")
-                    print(f"="*60)
-                    print(f"💼 PORTFOLIO AGENT FINAL RESPONSE:")
-                    print(f"="*60)
+                self._log_final(final_content, "FINAL RESPONSE GENERATED")
                 
                 return final_content
             else:
                 # No tools needed, return the direct response
-                direct_response = response.choices[0].message.content
+                direct_response = content
                 
-                if self.verbose:
-                    print(f"✅ DIRECT RESPONSE (no tools needed)")
-                    print(f"📝 Response length: {len(direct_response)} characters")
-                    print(f"="*60)
-                    print(f"💼 PORTFOLIO AGENT FINAL RESPONSE:")
-                    print(f"="*60)
+                self._log_final(direct_response, "DIRECT RESPONSE (no tools needed)")
                 
                 return direct_response
 
         except Exception as e:
             error_msg = f"An error occurred: {str(e)}"
-            if self.verbose:
-                print(f"❌ CRITICAL ERROR: {error_msg}")
+            self._log.debug("❌ CRITICAL ERROR: %s", error_msg)
+            if on_token is not None:
+                on_token(error_msg)
             return error_msg
 
-# Example usage
-if __name__ == "__main__":
+    def poll_batch(self, batch_id: str, poll_interval: float = 30.0, max_interval: float = 300.0) -> Any:
+        """Wait for an OpenAI batch to reach a final state, backing off exponentially between checks"""
+        return poll_batch(self.client, batch_id, self._log, poll_interval, max_interval)
+
+    def _run_batch_tool_call(self, user_message: str, tool_call: Dict[str, Any]) -> str:
+        """Execute one tool call from a batch response as tool message content, turning failures into an error result"""
+        try:
+            function_args = loads(tool_call["function"]["arguments"])
+            bypass_cache = bool(_REFRESH_PATTERN.search(user_message))
+            tool_result = self._execute_tool_call(tool_call["function"]["name"], function_args, bypass_cache)
+        except Exception as e:
+            tool_result = {
+                "success": False,
+                "error": f"Tool execution failed: {str(e)}"
+            }
+        return dumps(_columnar(tool_result))
+
+    def chat_batch(self, user_messages: List[str], poll_interval: float = 30.0) -> List[str]:
+        """
+        Analyze many portfolio queries offline through the OpenAI Batch API (lower cost, results within 24h)
+        
+        Args:
+            user_messages (List[str]): Natural language queries from the user
+            poll_interval (float): Seconds to wait before the first batch status check
+            
+        Returns:
+            List[str]: One response per query, in the same order as user_messages
+        """
+        return chat_batch(
+            self.client,
+            user_messages,
+            _SYSTEM_MSG,
+            self._select_tools,
+            self._run_batch_tool_call,
+            self._executor,
+            self._log,
+            poll_interval
+        )
+
+# REPL input history, kept across sessions
+_HISTORY_FILE = os.path.expanduser("~/.portfolio_agent_history")
+
+_EXIT_COMMANDS = frozenset(["quit", "exit", "q"])
+
+def main() -> None:
+    """Interactive REPL for the portfolio agent"""
+    # Line editing and persistent history for input() where readline is available (not on Windows)
+    try:
+        import readline
+    except ImportError:
+        pass
+    else:
+        try:
+            readline.read_history_file(_HISTORY_FILE)
+        except OSError:
+            pass
+        atexit.register(readline.write_history_file, _HISTORY_FILE)
+    
+    # The REPL is the application here, so it decides where the verbose trace goes
+    enable_verbose_output(log.name)
+    
     # Initialize the portfolio agent (API keys will be loaded from .env file)
     try:
         # Set verbose=True to see the agent's thinking process
-        portfolio_agent = PortfolioAgent(verbose=True)
+        portfolio_agent = PortfolioAgent(verbose=True, prefetch=True)
     except ValueError as e:
         print(f"Error: {e}")
         print("Please make sure you have a .env file with the required API keys.")
-        exit(1)
+        sys.exit(1)
     
     # Example conversations for testing different portfolio analysis scenarios
     example_queries = [
@@ -745,13 +852,24 @@ if __name__ == "__main__":
         "Show me everything about wallet 0xabcdef1234567890 on polygon",
     ]
     
+    portfolio_agent.warmup()
+    
     print("Portfolio Analysis Agent - Ready to analyze wallets!")
     print("Type 'quit' to exit\n")
     
     while True:
-        user_input = input("You: ")
-        if user_input.lower() in ['quit', 'exit', 'q']:
+        try:
+            user_input = input("You: ")
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if user_input.strip().lower() in _EXIT_COMMANDS:
             break
             
-        response = portfolio_agent.chat(user_input)
-        print(f"Portfolio Agent: {response}\n") 
\ No newline at end of file
+        print("Portfolio Agent: ", end="", flush=True)
+        portfolio_agent.chat(user_input, on_token=lambda token: print(token, end="", flush=True))
+        print("\n")
+
+# Example usage
+if __name__ == "__main__":
+    main()